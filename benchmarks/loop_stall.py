@@ -0,0 +1,86 @@
+# loop_stall.py
+#
+# Measures how long the event loop is blocked while tasks are persisted,
+# before (synchronous json.dump on the loop, as the cogs used to do) and
+# after (WriteCoordinator: serialization and fsync in a worker thread).
+#
+# Run from the repository root:  python -m benchmarks.loop_stall [task_count]
+
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from utils.loop_monitor import LoopStallMonitor
+from utils.write_coordinator import WriteCoordinator
+
+
+def make_tasks(count):
+    return [
+        {
+            "Task ID": str(uuid.uuid4()),
+            "Created by": "benchmark",
+            "Category": "Small Arms",
+            "Item Needed": "Argenti r.II Rifle",
+            "Quantity": 20,
+            "Delivery Location": "CGB-Sit3",
+            "Assigned to": None,
+            "Status": "Pending",
+            "Message ID": 1300000000000000000 + i,
+        }
+        for i in range(count)
+    ]
+
+
+async def save_blocking(path, tasks, saves):
+    """The old pattern: open(..., "w") + json.dump(indent=4) inside a coroutine."""
+    for _ in range(saves):
+        with open(path, "w") as file:
+            json.dump(tasks, file, indent=4)
+        await asyncio.sleep(0.05)
+
+
+async def save_offloaded(path, tasks, saves):
+    """The new pattern: submit to the write coordinator and keep serving the loop."""
+    writer = WriteCoordinator()
+    for _ in range(saves):
+        await writer.write(path, tasks)
+        await asyncio.sleep(0.05)
+
+
+async def measure(label, saver, path, tasks, saves):
+    monitor = LoopStallMonitor(interval=0.005, threshold=0.02)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    monitor.reset()
+    start = time.perf_counter()
+    await saver(path, tasks, saves)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.05)
+    monitor.stop()
+    stats = monitor.get_stats()
+    print(
+        f"{label:<10} {saves} saves in {elapsed:6.2f} s | "
+        f"max stall {stats['max_stall_ms']:8.1f} ms | total stall {stats['total_stall_ms']:8.1f} ms | "
+        f"stalls > 20 ms: {stats['stalls_over_threshold']}"
+    )
+
+
+async def main():
+    logging.getLogger('discord.loop_monitor').setLevel(logging.ERROR)  # Only the summary lines
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    saves = 10
+    tasks = make_tasks(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tasks.json"
+        print(f"Persisting {count} tasks, {saves} times each:")
+        await measure("before", save_blocking, path, tasks, saves)
+        await measure("after", save_offloaded, path, tasks, saves)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
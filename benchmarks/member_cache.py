@@ -0,0 +1,149 @@
+# member_cache.py
+#
+# Startup cost of the gateway member cache for a synthetic guild, with the
+# default settings (every member chunked and cached before on_ready) and with
+# config.LOW_FOOTPRINT_MEMBERS (no chunking at startup; one uncached download
+# for the player database and a MemberLookup LRU for on-demand lookups).
+#
+# Members are built by discord.py itself from GUILD_MEMBERS_CHUNK payloads, so
+# time is the CPU spent decoding and constructing them; the chunk round trips
+# to Discord come on top and scale with the frame count shown.
+#
+# Run from the repository root:  python -m benchmarks.member_cache [member_count]
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+import discord
+
+import config
+from utils.member_lookup import MemberLookup
+
+GUILD_ID = 1300000000000000000
+CHUNK_SIZE = 1000  # Members per GUILD_MEMBERS_CHUNK frame
+ROLE_IDS = [1312631873884651550, 1312631928553209948, 1312631992617144420, 1312632035780591657]
+
+
+def make_member(i):
+    return {
+        "user": {
+            "id": str(1310000000000000000 + i),
+            "username": f"soldier{i}",
+            "global_name": f"Soldier {i}",
+            "discriminator": "0",
+            "avatar": "a" * 32,
+            "public_flags": 0,
+        },
+        "nick": f"[GB] Soldier {i}" if i % 3 else None,
+        "roles": [str(ROLE_IDS[i % len(ROLE_IDS)])] + ([str(ROLE_IDS[0])] if i % 5 == 0 else []),
+        "joined_at": "2024-11-30T12:00:00.000000+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def make_chunk_frames(count):
+    """Encoded GUILD_MEMBERS_CHUNK payloads, as they arrive over the gateway."""
+    chunk_count = (count + CHUNK_SIZE - 1) // CHUNK_SIZE
+    return [
+        json.dumps({
+            "guild_id": str(GUILD_ID),
+            "members": [make_member(i) for i in range(start, min(start + CHUNK_SIZE, count))],
+            "chunk_index": index,
+            "chunk_count": chunk_count,
+        }).encode()
+        for index, start in enumerate(range(0, count, CHUNK_SIZE))
+    ]
+
+
+def make_guild(low_footprint):
+    intents = discord.Intents.default()
+    intents.members = True
+    options = {"chunk_guilds_at_startup": False, "member_cache_flags": discord.MemberCacheFlags.none()} if low_footprint else {}
+    client = discord.Client(intents=intents, **options)
+    state = client._connection
+    guild = discord.Guild(data={"id": str(GUILD_ID), "name": "Synthetic", "member_count": 0, "roles": []}, state=state)
+    state._add_guild(guild)
+    return state, guild
+
+
+def decode_members(state, guild, frame):
+    data = json.loads(frame)
+    return [discord.Member(data=member, guild=guild, state=state) for member in data["members"]]
+
+
+def measure(func):
+    """Run func, returning (result, seconds, bytes still allocated, peak bytes)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+
+def full_cache(frames):
+    state, guild = make_guild(low_footprint=False)
+
+    def startup():
+        for frame in frames:
+            for member in decode_members(state, guild, frame):
+                guild._add_member(member)
+        return guild
+
+    return measure(startup)
+
+
+def low_footprint(frames, lookups):
+    state, guild = make_guild(low_footprint=True)
+    lookup = MemberLookup()
+
+    def startup():
+        # PlayerManager.initialize_members: guild.chunk(cache=False), members dropped afterwards
+        seen = 0
+        for frame in frames:
+            seen += sum(1 for member in decode_members(state, guild, frame) if not member.bot)
+        return seen
+
+    def on_demand():
+        # Lookups after startup: at most config.MEMBER_LOOKUP_CACHE_SIZE members stay around
+        for frame in frames:
+            for member in decode_members(state, guild, frame)[:lookups]:
+                lookup.put(member)
+        return lookup
+
+    return measure(startup), measure(on_demand)
+
+
+def run(count):
+    frames = make_chunk_frames(count)
+    lookups = config.MEMBER_LOOKUP_CACHE_SIZE
+    print(f"\n{count} members, {len(frames)} chunk frames ({sum(map(len, frames)) / 1024:.0f} KB on the wire)")
+
+    guild, elapsed, current, peak = full_cache(frames)
+    print("  full cache (default)")
+    print(f"    frames before on_ready   {len(frames):>8}")
+    print(f"    startup CPU              {elapsed * 1000:>8.0f} ms")
+    print(f"    retained                 {current / 1024 ** 2:>8.1f} MB  ({len(guild.members)} members)")
+    print(f"    peak                     {peak / 1024 ** 2:>8.1f} MB")
+    del guild
+
+    (seen, elapsed, current, peak), (lookup, _, lru_current, _) = low_footprint(frames, lookups)
+    print("  low footprint")
+    print(f"    frames before on_ready   {0:>8}")
+    print(f"    player init CPU          {elapsed * 1000:>8.0f} ms  (after on_ready, {seen} members)")
+    print(f"    retained after init      {current / 1024 ** 2:>8.1f} MB")
+    print(f"    peak during init         {peak / 1024 ** 2:>8.1f} MB")
+    print(f"    lookup LRU when full     {lru_current / 1024 ** 2:>8.1f} MB  ({len(lookup.members)} members)")
+
+
+if __name__ == "__main__":
+    for count in [int(arg) for arg in sys.argv[1:]] or [10_000]:
+        run(count)
@@ -0,0 +1,39 @@
+# serializers.py
+#
+# Compares load and save times and file sizes of tasks.json for each installed
+# JSON backend, in both the legacy indented format and the compact format.
+#
+# Run from the repository root:  python -m benchmarks.serializers [task_count ...]
+
+import sys
+import time
+
+from benchmarks.loop_stall import make_tasks
+from utils import serializers
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(count, repeat=5):
+    tasks = make_tasks(count)
+    print(f"\n{count} tasks (best of {repeat})")
+    print(f"  {'backend':<8} {'format':<8} {'save ms':>9} {'load ms':>9} {'size KB':>9}")
+    for backend in serializers.BACKENDS:
+        for pretty in (True, False):
+            payload = serializers.dumps(tasks, pretty=pretty, backend_name=backend)
+            save_ms = best_of(lambda: serializers.dumps(tasks, pretty=pretty, backend_name=backend), repeat)
+            load_ms = best_of(lambda: serializers.loads(payload, backend_name=backend), repeat)
+            label = "indented" if pretty else "compact"
+            print(f"  {backend:<8} {label:<8} {save_ms:>9.1f} {load_ms:>9.1f} {len(payload) / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    for count in [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]:
+        run(count)
@@ -2,7 +2,6 @@
 
 import discord
 from discord.ext import commands
-import json
 from discord.ui import Modal, TextInput
 
 class DeliveryPointManagerCog(commands.Cog):
@@ -10,25 +9,15 @@ class DeliveryPointManagerCog(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.flow_data_file = "data/flow_data.json"
+        self.flow_data = bot.flow_data  # Shared flow data cache (see main.py)
         self.dashboard_channel_id = 1311021240386981928  # Replace with your dashboard channel ID
         self.delivery_point_message_id = None
-        self.load_flow_data()
-
-    def load_flow_data(self):
-        try:
-            with open(self.flow_data_file, "r") as file:
-                self.flow_data = json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.flow_data = {}
 
     def save_flow_data(self):
-        with open(self.flow_data_file, "w") as file:
-            json.dump(self.flow_data, file, indent=4)
+        self.flow_data.save()
 
-    @commands.Cog.listener()
-    async def on_ready(self):
-        """Ensure the delivery point message is present on bot startup."""
+    async def warmup(self):
+        """Ensure the delivery point message is present on bot startup (run once by bot.startup)."""
         dashboard_channel = self.bot.get_channel(self.dashboard_channel_id)
 
         if not dashboard_channel:
@@ -38,12 +27,14 @@ class DeliveryPointManagerCog(commands.Cog):
         # Register the delivery point view
         self.bot.add_view(self.create_delivery_point_view())
 
-        # Check if the delivery point message already exists
-        async for message in dashboard_channel.history(limit=10):
-            if message.author == self.bot.user and message.embeds and message.embeds[0].title == "Delivery Point Management":
-                self.delivery_point_message_id = message.id
-                break
-        else:
+        # Check if the delivery point message already exists (anchor registry, history scan as fallback)
+        self.delivery_point_message_id = await self.bot.anchors.resolve(
+            dashboard_channel,
+            "delivery_point_manager",
+            lambda message: message.embeds and message.embeds[0].title == "Delivery Point Management",
+            limit=10,
+        )
+        if self.delivery_point_message_id is None:
             # If no delivery point message exists, create one
             view = self.create_delivery_point_view()
             embed = discord.Embed(
@@ -58,6 +49,7 @@ class DeliveryPointManagerCog(commands.Cog):
             embed.set_footer(text="Click a button below to add a delivery point.")
             delivery_point_message = await dashboard_channel.send(embed=embed, view=view)
             self.delivery_point_message_id = delivery_point_message.id
+            self.bot.anchors.set(dashboard_channel, "delivery_point_manager", delivery_point_message.id)
 
     def create_delivery_point_view(self):
         """Create the view for the delivery point buttons."""
@@ -114,22 +106,15 @@ class DeliveryPointManagerCog(commands.Cog):
                         "hex": hex_value,
                         "location": location_value,
                         "password": password_value,
-                        "small_arms": [],
-                        "heavy_arms": [],
-                        "heavy_ammunition": [],
-                        "utility": [],
-                        "medical": [],
-                        "resource": [],
-                        "uniform": [],
-                        "vehicle": [],
-                        "shippable_structure": []
+                        # Contents are tracked in the inventory store, not in flow data
                     }
 
                     # Add to flow_data under 'delivery_selection'
-                    if 'delivery_selection' not in self.flow_data:
-                        self.flow_data['delivery_selection'] = {"buttons": []}
+                    flow_data = self.flow_data.data
+                    if 'delivery_selection' not in flow_data:
+                        flow_data['delivery_selection'] = {"buttons": []}
 
-                    self.flow_data['delivery_selection']['buttons'].append(new_delivery_option)
+                    flow_data['delivery_selection']['buttons'].append(new_delivery_option)
 
                     # Save flow_data
                     self.save_flow_data()
@@ -174,22 +159,15 @@ class DeliveryPointManagerCog(commands.Cog):
                         "hex": hex_value,
                         "location": location_value,
                         "password": "",  # No password for general delivery points
-                        "small_arms": [],
-                        "heavy_arms": [],
-                        "heavy_ammunition": [],
-                        "utility": [],
-                        "medical": [],
-                        "resource": [],
-                        "uniform": [],
-                        "vehicle": [],
-                        "shippable_structure": []
+                        # Contents are tracked in the inventory store, not in flow data
                     }
 
                     # Add to flow_data under 'delivery_selection'
-                    if 'delivery_selection' not in self.flow_data:
-                        self.flow_data['delivery_selection'] = {"buttons": []}
+                    flow_data = self.flow_data.data
+                    if 'delivery_selection' not in flow_data:
+                        flow_data['delivery_selection'] = {"buttons": []}
 
-                    self.flow_data['delivery_selection']['buttons'].append(new_delivery_option)
+                    flow_data['delivery_selection']['buttons'].append(new_delivery_option)
 
                     # Save flow_data
                     self.save_flow_data()
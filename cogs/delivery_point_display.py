@@ -2,75 +2,59 @@
 
 import discord
 from discord.ext import commands, tasks
-import json
+
+from utils.dashboard import Dashboard
 
 class DeliveryPointDisplayCog(commands.Cog):
     """Cog to display delivery points dynamically."""
 
     def __init__(self, bot):
         self.bot = bot
-        self.flow_data_file = "data/flow_data.json"
+        self.flow_data = bot.flow_data  # Shared flow data cache (see main.py)
         self.dashboard_channel_id = 1309638065559437375  # Replace with your dashboard channel ID
-        self.delivery_point_message_id = None
-        self.update_interval = 60  # Update every 60 seconds
-        self.update_delivery_points_message.start()  # Start the background task
+        # Re-rendered on flow data changes; edited only when the embed actually differs
+        self.dashboard = Dashboard(bot, "delivery_points", self.render, version=lambda: self.flow_data.version)
+        self.update_interval = 60  # Seconds between checks of flow_data.json for outside edits
+        self.watch_flow_data.start()  # Start the background task
 
     def cog_unload(self):
-        self.update_delivery_points_message.cancel()
-
-    def load_flow_data(self):
-        try:
-            with open(self.flow_data_file, "r") as file:
-                return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+        self.watch_flow_data.cancel()
+        self.dashboard.stop()
 
-    @commands.Cog.listener()
-    async def on_ready(self):
-        """Ensure the delivery point message is present on bot startup."""
+    async def warmup(self):
+        """Ensure the delivery point message is present on bot startup (run once by bot.startup)."""
         dashboard_channel = self.bot.get_channel(self.dashboard_channel_id)
 
         if not dashboard_channel:
             print("Dashboard channel not found!")
             return
 
-        # Check if the delivery point message already exists
-        async for message in dashboard_channel.history(limit=50):
-            if message.author == self.bot.user and message.embeds and message.embeds[0].title == "Available Delivery Points":
-                self.delivery_point_message_id = message.id
-                break
-        else:
-            # If no delivery point message exists, create one
-            embed = await self.create_delivery_points_embed()
-            delivery_point_message = await dashboard_channel.send(embed=embed)
-            self.delivery_point_message_id = delivery_point_message.id
+        # Check if the delivery point message already exists (anchor registry, history scan as fallback)
+        message_id = await self.bot.anchors.resolve(
+            dashboard_channel,
+            "delivery_points",
+            lambda message: message.embeds and message.embeds[0].title == "Available Delivery Points",
+            limit=50,
+        )
+        # Posts a new message if none exists, otherwise edits only if the points changed
+        self.dashboard.attach(self.dashboard_channel_id, message_id)
+        await self.dashboard.update()
 
     @tasks.loop(seconds=60)
-    async def update_delivery_points_message(self):
-        """Update the delivery points message periodically."""
-        if not self.delivery_point_message_id:
-            return
+    async def watch_flow_data(self):
+        """Notice edits made to flow_data.json outside the bot.
 
-        dashboard_channel = self.bot.get_channel(self.dashboard_channel_id)
-        if not dashboard_channel:
-            print("Dashboard channel not found!")
-            return
+        This is only a stat() call; a changed file is re-parsed, which fires
+        on_flow_data_update like any other change.
+        """
+        self.flow_data.refresh()
 
-        try:
-            message = await dashboard_channel.fetch_message(self.delivery_point_message_id)
-            embed = await self.create_delivery_points_embed()
-            await message.edit(embed=embed)
-        except discord.NotFound:
-            # Message not found; create a new one
-            embed = await self.create_delivery_points_embed()
-            delivery_point_message = await dashboard_channel.send(embed=embed)
-            self.delivery_point_message_id = delivery_point_message.id
+    async def render(self):
+        return {"embed": await self.create_delivery_points_embed()}
 
     async def create_delivery_points_embed(self):
         """Create an embed displaying the delivery points."""
-        flow_data = self.load_flow_data()
-        delivery_selection = flow_data.get('delivery_selection', {})
-        buttons = delivery_selection.get('buttons', [])
+        buttons = self.flow_data.buttons('delivery_selection')
 
         # Separate stockpiles and facilities
         stockpiles = []
@@ -118,7 +102,7 @@ class DeliveryPointDisplayCog(commands.Cog):
                 )
                 embed.add_field(name=f"Hex: {hex_value}", value=field_value, inline=False)
 
-        embed.set_footer(text="This list updates every minute.")
+        embed.set_footer(text="This list updates whenever delivery points change.")
         return embed
 
     def group_by_hex(self, delivery_points):
@@ -132,7 +116,7 @@ class DeliveryPointDisplayCog(commands.Cog):
     @commands.Cog.listener()
     async def on_flow_data_update(self):
         """Event to handle when flow data is updated."""
-        await self.update_delivery_points_message()
+        self.dashboard.request_update()
 
 async def setup(bot):
     await bot.add_cog(DeliveryPointDisplayCog(bot))
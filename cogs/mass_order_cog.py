@@ -2,11 +2,13 @@
 
 import discord
 from discord.ext import commands
-import json
 import uuid
 import asyncio
 import logging
 
+import config
+from cogs.task_board import order_embed, order_view, task_embed, task_view
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -18,16 +20,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger('discord.mass_order_cog')
 
-# Assuming TaskManager is defined in tasks_generator.py within the same directory
-from cogs.tasks_generator import TaskManager  # Adjust the import path as necessary
-
 class MassOrderCog(commands.Cog):
     """Cog to handle mass production orders via command-based interactions."""
 
     def __init__(self, bot):
         self.bot = bot
-        self.task_manager = TaskManager()  # Initialize TaskManager
-        self.flow_data_file = "data/flow_data.json"
+        self.task_manager = bot.task_manager  # Shared task repository (see main.py)
+        self.flow_data = bot.flow_data  # Shared flow data cache (see main.py)
         self.slice_sizes = {
             "small_arms": 20,
             "heavy_arms": 20,
@@ -41,28 +40,9 @@ class MassOrderCog(commands.Cog):
         }
         self.task_board_channel_id = 1309637916057800814  # Replace with your task board channel ID
         self.user_states = {}  # To track user progress
+        self.progress_reports = set()  # Background tasks reporting posting progress
         logger.info("MassOrderCog initialized.")
 
-    def load_flow_data(self):
-        """Load flow data from JSON file."""
-        try:
-            with open(self.flow_data_file, "r") as file:
-                data = json.load(file)
-                logger.info("Flow data loaded successfully.")
-                return data
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.error(f"Error loading flow data: {e}")
-            return {}
-
-    def save_flow_data(self):
-        """Save flow data to JSON file."""
-        try:
-            with open(self.flow_data_file, "w") as file:
-                json.dump(self.flow_data, file, indent=4)
-                logger.info("Flow data saved successfully.")
-        except Exception as e:
-            logger.error(f"Error saving flow data: {e}")
-
     @commands.command(name="mass_order")
     async def mass_order(self, ctx):
         """Command to initiate a mass production order."""
@@ -80,9 +60,7 @@ class MassOrderCog(commands.Cog):
         }
 
         # Fetch available sub-categories
-        flow_data = self.load_flow_data()
-        category_buttons = flow_data.get("produce_category_selection", {}).get("buttons", [])
-        valid_categories = [btn["label"] for btn in category_buttons]
+        valid_categories = self.flow_data.labels("produce_category_selection")
 
         if not valid_categories:
             await ctx.send("No production sub-categories are currently available. Please contact the administrator.")
@@ -122,12 +100,8 @@ class MassOrderCog(commands.Cog):
             logger.warning(f"User {user} attempted to process category selection without an active order.")
             return
 
-        # Reload flow_data.json to get the latest data
-        flow_data = self.load_flow_data()
-
-        # Validate sub-category
-        category_buttons = flow_data.get("produce_category_selection", {}).get("buttons", [])
-        valid_categories = [btn["label"] for btn in category_buttons]
+        # Validate sub-category (flow data is re-read only if the file changed)
+        valid_categories = self.flow_data.labels("produce_category_selection")
         if sub_category not in valid_categories:
             categories_list = '\n'.join([f"- `{category}`" for category in valid_categories])
             await ctx.send(
@@ -138,7 +112,7 @@ class MassOrderCog(commands.Cog):
             return
 
         # Retrieve the next_step corresponding to the selected sub-category
-        selected_button = next((btn for btn in category_buttons if btn["label"] == sub_category), None)
+        selected_button = valid_categories.get(sub_category)
         if not selected_button:
             await ctx.send("An error occurred retrieving the selected sub-category. Please try again.")
             logger.error(f"No matching button data found for sub-category: {sub_category}")
@@ -157,9 +131,7 @@ class MassOrderCog(commands.Cog):
         logger.info(f"User {user} selected sub-category: {sub_category}")
 
         # Fetch available items for the selected sub-category
-        items_data = flow_data.get(next_step, {})
-        items_buttons = items_data.get("buttons", [])
-        valid_items = [btn["label"] for btn in items_buttons]
+        valid_items = self.flow_data.labels(next_step)
 
         if not valid_items:
             await ctx.send("No items are currently available for the selected sub-category. Please contact the administrator.")
@@ -198,14 +170,9 @@ class MassOrderCog(commands.Cog):
             logger.warning(f"User {user} attempted to process item selection without an active order.")
             return
 
-        # Reload flow_data.json to get the latest data
-        flow_data = self.load_flow_data()
-
         # Retrieve current_step to access the correct items
         current_step = self.user_states[user_id].get("current_step")  # e.g., "produce_small_arms_items"
-        items_data = flow_data.get(current_step, {})
-        items_buttons = items_data.get("buttons", [])
-        valid_items = [btn["label"] for btn in items_buttons]
+        valid_items = self.flow_data.labels(current_step)
 
         if not valid_items:
             await ctx.send("No items available for the selected sub-category. Please contact the administrator.")
@@ -287,9 +254,7 @@ class MassOrderCog(commands.Cog):
                 logger.info(f"User {user} chose to add another item.")
                 
                 # Fetch available sub-categories
-                flow_data = self.load_flow_data()
-                category_buttons = flow_data.get("produce_category_selection", {}).get("buttons", [])
-                valid_categories = [btn["label"] for btn in category_buttons]
+                valid_categories = self.flow_data.labels("produce_category_selection")
                 
                 if not valid_categories:
                     await ctx.send("No production sub-categories are currently available. Please contact the administrator.")
@@ -323,9 +288,7 @@ class MassOrderCog(commands.Cog):
                 logger.info(f"User {user} chose to finalize the order.")
                 
                 # Fetch available delivery locations
-                flow_data = self.load_flow_data()
-                delivery_buttons = flow_data.get("delivery_selection", {}).get("buttons", [])
-                valid_locations = [btn["label"] for btn in delivery_buttons]
+                valid_locations = self.flow_data.labels("delivery_selection")
                 
                 if not valid_locations:
                     await ctx.send("No delivery locations are currently available. Please contact the administrator.")
@@ -367,12 +330,8 @@ class MassOrderCog(commands.Cog):
             logger.warning(f"User {user} attempted to process delivery location without an active order.")
             return
 
-        # Reload flow_data.json to get the latest data
-        flow_data = self.load_flow_data()
-
         # Validate delivery location
-        delivery_buttons = flow_data.get("delivery_selection", {}).get("buttons", [])
-        valid_locations = [btn["label"] for btn in delivery_buttons]
+        valid_locations = self.flow_data.labels("delivery_selection")
         if delivery_location not in valid_locations:
             delivery_list = '\n'.join([f"- `{location}`" for location in valid_locations])
             await ctx.send(
@@ -383,9 +342,7 @@ class MassOrderCog(commands.Cog):
             return
 
         # Retrieve delivery data
-        delivery_data = next(
-            (btn for btn in delivery_buttons if btn["label"] == delivery_location), None
-        )
+        delivery_data = valid_locations.get(delivery_location)
         if not delivery_data:
             await ctx.send("Invalid delivery location selected.", ephemeral=True)
             logger.error(f"User {user} selected an invalid delivery location: {delivery_location}")
@@ -398,6 +355,7 @@ class MassOrderCog(commands.Cog):
 
         # Slice the orders based on slice_sizes
         sliced_tasks = []
+        order_lines = []  # Slices grouped per order line, for aggregated posts
         for order in self.user_states[user_id]["orders"]:
             category = order["category"]
             item = order["item"]
@@ -407,20 +365,44 @@ class MassOrderCog(commands.Cog):
             logger.debug(f"Category: {category}, Slice Size: {slice_size}")  # Debug log
             slices = self.slice_order(quantity, slice_size)
 
-            for slice_qty in slices:
-                task = self.create_task(user, category, item, slice_qty, delivery_location, hex_location, password)
-                sliced_tasks.append(task)
+            line_tasks = []
+            for number, slice_qty in enumerate(slices, start=1):
+                task = self.create_task(user, category, item, slice_qty, delivery_location, hex_location, password,
+                                        slice_label=f"{number}/{len(slices)}")
+                line_tasks.append(task)
                 logger.info(f"Created sliced task: {slice_qty} of {item} for delivery at {delivery_location}")
+            sliced_tasks.extend(line_tasks)
+            order_lines.append(line_tasks)
 
-        # Post tasks to the task board
-        await self.post_tasks_to_board(ctx, sliced_tasks)
-        logger.info(f"Posted {len(sliced_tasks)} tasks to the task board for user {user}")
+        # Queue the posts; the scheduler drains them in the background
+        if config.MASS_ORDER_AGGREGATE:
+            batch = await self.post_orders_to_board(ctx, order_lines)
+        else:
+            batch = await self.post_tasks_to_board(ctx, sliced_tasks)
+        logger.info(f"Queued {len(sliced_tasks)} tasks for the task board for user {user}")
 
         # Clear the user's state
         del self.user_states[user_id]
         logger.info(f"Cleared user {user}'s state after order finalization.")
 
-        await ctx.send(f"Mass production order processed successfully. Created {len(sliced_tasks)} tasks.")
+        if batch is None:
+            return
+        progress = await ctx.send(
+            f"Mass production order processed successfully. Created {len(sliced_tasks)} tasks, "
+            f"posting {batch.total} messages to the task board..."
+        )
+        report = asyncio.create_task(self.report_progress(progress, batch, len(sliced_tasks)))
+        self.progress_reports.add(report)  # Keep a reference until it finishes
+        report.add_done_callback(self.progress_reports.discard)
+
+    async def report_progress(self, progress, batch, task_count):
+        """Edit the confirmation message while the order's posts drain, at most every few seconds."""
+        while not await batch.wait(timeout=5):
+            self.bot.editor.edit(progress, content=f"Created {task_count} tasks, posted {batch.finished}/{batch.total} messages to the task board...")
+        summary = f"Mass production order posted: {batch.posted}/{batch.total} messages on the task board for {task_count} tasks."
+        if batch.failed:
+            summary += f" {batch.failed} failed to post, check the logs."
+        await self.bot.editor.edit(progress, content=summary)
 
     def slice_order(self, total: int, slice_size: int):
         """Slice the total quantity into smaller chunks based on slice_size."""
@@ -433,7 +415,8 @@ class MassOrderCog(commands.Cog):
         logger.debug(f"Sliced total {original_total} into {slices}")
         return slices
 
-    def create_task(self, user: discord.User, category: str, item: str, quantity: int, delivery_location: str, hex_location: str, password: str):
+    def create_task(self, user: discord.User, category: str, item: str, quantity: int, delivery_location: str, hex_location: str, password: str,
+                    slice_label: str = None):
         """Create a task dictionary based on the sliced order."""
         task_id = str(uuid.uuid4())
         task = {
@@ -442,6 +425,7 @@ class MassOrderCog(commands.Cog):
             "Category": category.replace('_', ' ').title(),
             "Item Needed": item,
             "Quantity": quantity,
+            "Slice": slice_label,  # "3/100": position within the order line
             "Delivery Location": delivery_location,
             "Assigned to": None,
             "Status": "Pending",
@@ -455,148 +439,52 @@ class MassOrderCog(commands.Cog):
         return task
 
     async def post_tasks_to_board(self, ctx, tasks):
-        """Post all created tasks to the task board channel."""
+        """Queue one task board post per task. Returns the PostBatch, or None without a task board."""
         task_channel = self.bot.get_channel(self.task_board_channel_id)
         if not task_channel:
             logger.error("Task board channel not found!")
             await ctx.send("Task board channel not found. Please contact the administrator.", ephemeral=True)
-            return
+            return None
+
+        def on_posted(index, message):
+            # Save the message ID to the task
+            task = tasks[index]
+            task["Message ID"] = message.id
+            self.task_manager.update_task(task["Task ID"], task)
+
+        # One call per task: the buttons come with the message
+        posts = [{"embed": self.create_task_embed(task), "view": task_view(task)} for task in tasks]
+        return self.bot.poster.submit_batch(task_channel, posts, on_posted)
 
-        for task in tasks:
-            embed = self.create_task_embed(task)
-            try:
-                message = await task_channel.send(embed=embed)
-                await message.add_reaction("🖐️")  # Accept Task
-                await message.add_reaction("✅")  # Complete Task
-                await message.add_reaction("🛑")  # Abandon Task
+    async def post_orders_to_board(self, ctx, order_lines):
+        """Queue one post per order line; its slices are claimed from the message's menu and buttons."""
+        task_channel = self.bot.get_channel(self.task_board_channel_id)
+        if not task_channel:
+            logger.error("Task board channel not found!")
+            await ctx.send("Task board channel not found. Please contact the administrator.", ephemeral=True)
+            return None
 
-                # Save the message ID to the task
+        def on_posted(index, message):
+            # Every slice of the line lives on the same message
+            tasks = order_lines[index]
+            for task in tasks:
                 task["Message ID"] = message.id
                 self.task_manager.update_task(task["Task ID"], task)
-                logger.info(f"Task {task['Task ID']} posted to task board.")
+            logger.info(f"Posted {len(tasks)} slices of {tasks[0]['Item Needed']} as one task board message.")
 
-            except Exception as e:
-                logger.error(f"Failed to post task {task['Task ID']} to task board: {e}")
-                await ctx.send(f"Failed to post task {task['Task ID']} to task board.", ephemeral=True)
+        posts = [{"embed": order_embed(tasks), "view": order_view(tasks)} for tasks in order_lines]
+        return self.bot.poster.submit_batch(task_channel, posts, on_posted)
 
     def create_task_embed(self, task):
         """Create an embed for the task."""
-        def get_status_color(status):
-            colors = {
-                "Pending": discord.Color.red(),
-                "In Progress": discord.Color.gold(),
-                "Completed": discord.Color.green(),
-                "Abandoned": discord.Color.dark_red(),
-            }
-            return colors.get(status, discord.Color.default())
-
-        task_description = "\n".join(
-            [f"- **{key.replace('_', ' ').title()}:** {value}" for key, value in task.items() if key not in ('Message ID', 'Task ID')]
-        )
-        embed = discord.Embed(
-            title="Task Status: " + task["Status"],
-            description=task_description,
-            color=get_status_color(task["Status"])
-        )
-        embed.add_field(
-            name="Actions",
-            value=(
-                "React with:\n"
-                "🖐️ to **Accept** the task\n"
-                "✅ to **Complete** the task\n"
-                "🛑 to **Abandon** the task"
-            ),
-            inline=False
-        )
-        return embed
-
-    @commands.Cog.listener()
-    async def on_reaction_add(self, reaction, user):
-        """Handle reactions on task messages."""
-        # Ignore bot's own reactions
-        if user.bot:
-            return
-
-        # Get the message the reaction was added to
-        message = reaction.message
-
-        # Check if the message ID exists in any task
-        task = self.task_manager.get_task_by_message_id(message.id)
-        if not task:
-            return  # Reaction is not on a task message
-
-        emoji = str(reaction.emoji)
-
-        # Define action based on emoji
-        if emoji == "🖐️":
-            await self.accept_task(user, task, message)
-        elif emoji == "✅":
-            await self.complete_task(user, task, message)
-        elif emoji == "🛑":
-            await self.abandon_task(user, task, message)
-
-    async def accept_task(self, user, task, message):
-        """Assign the task to the user."""
-        if task["Assigned to"]:
-            await user.send(f"Task `{task['Task ID']}` is already assigned to {task['Assigned to']}.")
-            logger.info(f"User {user} attempted to accept task {task['Task ID']} which is already assigned.")
-            return
-
-        # Assign the task
-        task["Assigned to"] = user.name
-        task["Status"] = "In Progress"
-        self.task_manager.update_task(task["Task ID"], task)
-
-        # Update the embed to reflect assignment
-        embed = self.create_task_embed(task)
-        await message.edit(embed=embed)
-        logger.info(f"Task {task['Task ID']} assigned to user {user}.")
-
-        await user.send(f"You have accepted task `{task['Task ID']}`: {task['Item Needed']} x {task['Quantity']}.")
-
-    async def complete_task(self, user, task, message):
-        """Mark the task as completed."""
-        if task["Assigned to"] != user.name:
-            await user.send(f"You are not assigned to task `{task['Task ID']}`.")
-            logger.info(f"User {user} attempted to complete task {task['Task ID']} not assigned to them.")
-            return
-
-        # Complete the task
-        task["Status"] = "Completed"
-        self.task_manager.update_task(task["Task ID"], task)
-
-        # Update the embed to reflect completion
-        embed = self.create_task_embed(task)
-        await message.edit(embed=embed)
-        logger.info(f"Task {task['Task ID']} completed by user {user}.")
-
-        await user.send(f"You have completed task `{task['Task ID']}`: {task['Item Needed']} x {task['Quantity']}.")
-
-    async def abandon_task(self, user, task, message):
-        """Mark the task as abandoned."""
-        if task["Assigned to"] and task["Assigned to"] != user.name:
-            await user.send(f"You cannot abandon task `{task['Task ID']}` as it is assigned to {task['Assigned to']}.")
-            logger.info(f"User {user} attempted to abandon task {task['Task ID']} assigned to {task['Assigned to']}.")
-            return
-
-        # Abandon the task
-        task["Status"] = "Abandoned"
-        task["Assigned to"] = None
-        self.task_manager.update_task(task["Task ID"], task)
-
-        # Update the embed to reflect abandonment
-        embed = self.create_task_embed(task)
-        await message.edit(embed=embed)
-        logger.info(f"Task {task['Task ID']} abandoned by user {user}.")
-
-        await user.send(f"You have abandoned task `{task['Task ID']}`: {task['Item Needed']} x {task['Quantity']}.")
+        return task_embed(task)
 
     @commands.command(name="reload_flow_data")
     @commands.has_role("Admin")  # Replace "Admin" with your desired role name
     async def reload_flow_data(self, ctx):
         """Command to reload flow_data.json."""
-        flow_data = self.load_flow_data()
-        if flow_data:
+        await self.flow_data.reload()
+        if self.flow_data.data:
             await ctx.send("Flow data reloaded successfully.")
             logger.info(f"Flow data reloaded by user {ctx.author}.")
         else:
@@ -1,37 +1,30 @@
 import discord
 from discord.ext import commands
-import json
+
+from utils.member_lookup import LookupMember
 
 class MedalManager(commands.Cog):
     """Cog for managing medals, displaying them, and awarding them to players."""
 
     def __init__(self, bot):
         self.bot = bot
+        self.storage = bot.storage  # Async JSON storage (see main.py)
         self.medal_data_path = "data/medals.json"  # Path to the medal JSON
-        self.player_data_path = "data/player_data.json"  # Path to the player JSON
-        self.medals = self.load_medal_data()
-        self.players = self.load_player_data()
+        self.medals = []
+        self.players = bot.players  # Shared player repository (see main.py)
+
+    async def cog_load(self):
+        """Load medal data off the event loop when the cog is added."""
+        self.medals = await self.load_medal_data()
 
-    def load_medal_data(self):
+    async def load_medal_data(self):
         """Load medal data from a JSON file."""
-        try:
-            with open(self.medal_data_path, "r") as file:
-                return json.load(file)["medals"]
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-
-    def save_player_data(self):
-        """Save updated player data to a JSON file."""
-        with open(self.player_data_path, "w") as file:
-            json.dump(self.players, file, indent=4)
-
-    def load_player_data(self):
-        """Load player data from a JSON file."""
-        try:
-            with open(self.player_data_path, "r") as file:
-                return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {"players": {}}
+        data = await self.storage.load_json(self.medal_data_path, default={})
+        return data.get("medals", [])
+
+    def save_medal_data(self):
+        """Queue the medal list to be written to its JSON file."""
+        return self.storage.save_json(self.medal_data_path, {"medals": self.medals})
 
     @commands.command(name="show_medal")
     async def show_medal(self, ctx, *, medal_name: str):
@@ -52,45 +45,21 @@ class MedalManager(commands.Cog):
             await ctx.send(f"Medal '{medal_name}' not found.")
 
     @commands.command(name="give_medal")  # example: !give_medal @user MedalName
-    async def give_medal(self, ctx, member: discord.Member, *, medal_name: str):
+    async def give_medal(self, ctx, member: LookupMember, *, medal_name: str):
         """Award a medal to a player."""
         medal = next((m for m in self.medals if m["name"].lower() == medal_name.lower()), None)
         if not medal:
             await ctx.send(f"Medal '{medal_name}' not found.")
             return
 
-        player_id = str(member.id)
-        if player_id not in self.players["players"]:
-            # Initialize player data if they don't already exist
-            self.players["players"][player_id] = {
-                "server_nickname": member.display_name,
-                "rank": "Helots",
-                "war_points": 0,
-                "deployments": [],
-                "specialties": [],
-                "achievements": [],
-                "tasks_completed": 0,
-                "resources_contributed": 0,
-                "medals": [],
-                "notes": ""
-            }
-
-        player_data = self.players["players"][player_id]
-
-        # Check if the player already has the medal
-        if medal["name"] in [m["name"] for m in player_data["medals"]]:
+        # Initialize player data if they don't already exist
+        self.players.ensure_player(member)
+
+        # Award the medal (also adds it to achievements and updates war points)
+        if not self.players.award_medal(member.id, medal):
             await ctx.send(f"{member.display_name} already has the '{medal_name}' medal.")
             return
 
-        # Award the medal
-        player_data["medals"].append({
-            "name": medal["name"],
-            "war_points": medal["war_points"]
-        })
-        player_data["achievements"].append(medal["name"])  # Add medal to achievements
-        player_data["war_points"] += medal["war_points"]  # Update war points
-        self.save_player_data()
-
         # Confirm medal assignment
         embed = discord.Embed(
             title=f"Medal Awarded: {medal['name']}",
@@ -104,11 +73,10 @@ class MedalManager(commands.Cog):
 
 
     @commands.command(name="achievements") # example: !player_profile @user
-    async def player_profile(self, ctx, member: discord.Member = None):
+    async def player_profile(self, ctx, member: LookupMember = None):
         """Display the player's achievements, including medals and war points."""
         member = member or ctx.author  # Default to the command caller
-        player_id = str(member.id)
-        player_data = self.players["players"].get(player_id, None)
+        player_data = self.players.get(member.id)
 
         if not player_data:
             await ctx.send(f"No data found for {member.display_name}.")
@@ -172,8 +140,7 @@ class MedalManager(commands.Cog):
         new_medal["image_url"] = image_url.content if image_url.content.lower() != 'none' else None
 
         self.medals.append(new_medal)
-        with open(self.medal_data_path, "w") as file:
-            json.dump({"medals": self.medals}, file, indent=4)
+        self.save_medal_data()
 
         await ctx.send(f"Medal '{new_medal['name']}' created successfully.")
         
@@ -183,8 +150,7 @@ class MedalManager(commands.Cog):
         medal = next((m for m in self.medals if m["name"].lower() == name.lower()), None)
         if medal:
             self.medals.remove(medal)
-            with open(self.medal_data_path, "w") as file:
-                json.dump({"medals": self.medals}, file, indent=4)
+            self.save_medal_data()
             await ctx.send(f"Medal '{name}' deleted successfully.")
         else:
             await ctx.send(f"Medal '{name}' not found.")       
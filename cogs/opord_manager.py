@@ -11,9 +11,8 @@ class OrderManagerCog(commands.Cog):
         self.operations_channel_id = 1312603657577042000  # Replace with your operations channel ID
         self.mission_wizard_message_id = None  # To store the message ID of the mission wizard message
 
-    @commands.Cog.listener()
-    async def on_ready(self):
-        """Ensure the mission wizard message is present on bot startup."""
+    async def warmup(self):
+        """Ensure the mission wizard message is present on bot startup (run once by bot.startup)."""
         dashboard_channel = self.bot.get_channel(self.dashboard_channel_id)
 
         if not dashboard_channel:
@@ -23,12 +22,14 @@ class OrderManagerCog(commands.Cog):
         # Register the view
         self.bot.add_view(self.create_mission_wizard_view())
 
-        # Check if the mission wizard message already exists
-        async for message in dashboard_channel.history(limit=50):
-            if message.author == self.bot.user and message.embeds and message.embeds[0].title == "Mission Wizard":
-                self.mission_wizard_message_id = message.id
-                break
-        else:
+        # Check if the mission wizard message already exists (anchor registry, history scan as fallback)
+        self.mission_wizard_message_id = await self.bot.anchors.resolve(
+            dashboard_channel,
+            "mission_wizard",
+            lambda message: message.embeds and message.embeds[0].title == "Mission Wizard",
+            limit=50,
+        )
+        if self.mission_wizard_message_id is None:
             # If no mission wizard message exists, create one
             view = self.create_mission_wizard_view()
             embed = discord.Embed(
@@ -43,6 +44,7 @@ class OrderManagerCog(commands.Cog):
             embed.set_footer(text="Click a button below to create a report.")
             mission_wizard_message = await dashboard_channel.send(embed=embed, view=view)
             self.mission_wizard_message_id = mission_wizard_message.id
+            self.bot.anchors.set(dashboard_channel, "mission_wizard", mission_wizard_message.id)
 
     def create_mission_wizard_view(self):
         """Create the view for the mission wizard buttons."""
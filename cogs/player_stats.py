@@ -1,36 +1,20 @@
-import json
 import discord
 from discord.ext import commands, tasks
-from pathlib import Path
+
+import config
+from utils.dashboard import Dashboard
 
 class PlayerManager(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.data_folder = Path("data")  # Path to the data folder
-        self.file_path = self.data_folder / "player_data.json"  # Path to the JSON file
-        self.players = self.load_data()
+        self.players = bot.players  # Shared player repository (see main.py)
         self.leaderboard_channel_id = 1312859293334245376  # Set the channel ID for the leaderboard
+        # Re-rendered on player changes; edited only when the top 10 actually differs
+        self.leaderboard = Dashboard(bot, "leaderboard", self.render_leaderboard, version=lambda: self.players.version)
 
-    def load_data(self):
-        """Load player data from JSON or create a new one if it doesn't exist."""
-        if not self.data_folder.exists():
-            self.data_folder.mkdir()  # Create the data folder if it doesn't exist
-
-        if self.file_path.exists():
-            with open(self.file_path, "r") as file:
-                return json.load(file)
-        else:
-            # Create a new file if it doesn't exist
-            data = {"players": {}}
-            self.save_data(data)
-            return data
-
-    def save_data(self, data=None):
-        """Save player data to JSON."""
-        if data is None:
-            data = self.players
-        with open(self.file_path, "w") as file:
-            json.dump(data, file, indent=4)
+    def cog_unload(self):
+        self.leaderboard.stop()
+        self.resync_members.cancel()
 
     def get_highest_rank(self, member):
         """Determine the highest rank of a member based on their roles."""
@@ -57,52 +41,91 @@ class PlayerManager(commands.Cog):
         # Default to "Helots" if no roles match
         return "Helots"
 
-    def add_player(self, member):
-        """Add a new player to the database."""
-        if str(member.id) not in self.players["players"]:
-            # Determine the player's rank based on their roles
-            rank = self.get_highest_rank(member)
-
-            self.players["players"][str(member.id)] = {
-                "server_nickname": member.display_name,
-                "rank": rank,  # Assign the detected rank
-                "war_points": 0,
-                "deployments": [],
-                "specialties": [],
-                "achievements": [],
-                "tasks_completed": 0,
-                "resources_contributed": 0,
-                "medals": [],
-                "notes": ""
-            }
-            self.save_data()
+    def sync_member(self, member):
+        """Add a member to the database, or refresh their nickname and rank (saved debounced)."""
+        # Determine the player's rank based on their roles
+        nickname, rank = member.display_name, self.get_highest_rank(member)
+        if not self.players.add_player(member.id, nickname, rank):
+            self.players.update_player(member.id, server_nickname=nickname, rank=rank, active=True)
 
     async def initialize_members(self):
-        """Add all current server members to the player database."""
+        """Reconcile the player database with the current server members in a single write."""
+        current = {}
         for guild in self.bot.guilds:
-            for member in guild.members:
+            if guild.chunked:
+                members = guild.members
+            else:
+                # Low-footprint mode: download the member list once, caching it only for listed guilds
+                members = await guild.chunk(cache=guild.id in config.MEMBER_CHUNK_GUILD_IDS)
+            for member in members:
                 if not member.bot:  # Skip bots
-                    self.add_player(member)
+                    current[member.id] = (member.display_name, self.get_highest_rank(member))
+        return self.players.reconcile(current)
+
+    async def warmup(self):
+        """Ensure the database is populated once the bot is ready (run once by bot.startup)."""
+        counts = await self.initialize_members()
+        print(f"Player database initialized: {counts['added']} added, {counts['updated']} updated, "
+              f"{counts['departed']} departed.")
+        await self.find_leaderboard_message()
+        await self.leaderboard.update()
+        if config.LOW_FOOTPRINT_MEMBERS:
+            self.resync_members.start()
+
+    @tasks.loop(seconds=config.MEMBER_RESYNC_INTERVAL)
+    async def resync_members(self):
+        """Low-footprint mode: pick up nickname and role changes of uncached members.
+
+        Discord drops GUILD_MEMBER_UPDATE for members that aren't cached, so
+        on_member_update never fires for them; a periodic reconcile catches up.
+        """
+        if self.resync_members.current_loop == 0:
+            return  # warmup has just reconciled
+        counts = await self.initialize_members()
+        if any(counts.values()):
+            print(f"Player database re-synced: {counts['added']} added, {counts['updated']} updated, "
+                  f"{counts['departed']} departed.")
 
     @commands.Cog.listener()
-    async def on_ready(self):
-        """Ensure the database is populated once the bot is ready."""
-        await self.initialize_members()
-        print("Player database initialized.")
-        self.update_leaderboard.start()  # Start the leaderboard update loop
+    async def on_player_update(self, player_id, player):
+        """Refresh the leaderboard after player changes (debounced)."""
+        self.leaderboard.request_update()
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Automatically add a new member when they join the server."""
         if not member.bot:  # Skip bots
-            self.add_player(member)
+            self.sync_member(member)
             print(f"Added new member: {member.display_name}")
 
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        """Keep the stored nickname and rank current (cached members only, see resync_members)."""
+        if after.bot:
+            return
+        if before.display_name != after.display_name or before.roles != after.roles:
+            self.sync_member(after)
+            self.bot.members.discard(after.guild.id, after.id)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload):
+        """Mark players who left as inactive; their records and history are kept.
+
+        The raw event fires whether or not the member was cached.
+        """
+        if payload.user.bot:
+            return
+        self.bot.members.discard(payload.guild_id, payload.user.id)
+        # Still a member of another server the bot is in
+        if any(guild.id != payload.guild_id and guild.get_member(payload.user.id) for guild in self.bot.guilds):
+            return
+        self.players.update_player(payload.user.id, active=False)
+
     @commands.command(name="show_profile")
     async def show_profile(self, ctx, member: discord.Member = None):
         """Show the profile of a member."""
         member = member or ctx.author  # Default to the command caller
-        player_data = self.players["players"].get(str(member.id), None)
+        player_data = self.players.get(member.id)
 
         if player_data:
             # Extract medal names for display
@@ -133,23 +156,29 @@ class PlayerManager(commands.Cog):
     async def set_leaderboard_channel(self, ctx, channel: discord.TextChannel):
         """Set the leaderboard channel."""
         self.leaderboard_channel_id = channel.id
+        await self.find_leaderboard_message()
+        await self.leaderboard.update(force=True)
         await ctx.send(f"Leaderboard channel set to {channel.mention}")
 
-    @tasks.loop(minutes=5)
-    async def update_leaderboard(self):
-        """Update the leaderboard message in the designated channel."""
-        if not self.leaderboard_channel_id:
-            return  # Skip if the leaderboard channel is not set
-
-        guild = self.bot.guilds[0]  # Adjust for multi-guild bots
-        channel = guild.get_channel(self.leaderboard_channel_id)
-
+    async def find_leaderboard_message(self):
+        """Locate an existing leaderboard message in the leaderboard channel."""
+        channel = self.bot.get_channel(self.leaderboard_channel_id)
         if not channel:
             return  # Skip if the channel no longer exists
 
-        # Sort players by tasks completed
+        message_id = await self.bot.anchors.resolve(
+            channel,
+            "leaderboard",
+            lambda message: message.embeds and message.embeds[0].title == "Leaderboard",
+            limit=10,
+        )
+        self.leaderboard.attach(self.leaderboard_channel_id, message_id)
+
+    async def render_leaderboard(self):
+        """Render the leaderboard message."""
+        # Sort players by tasks completed, leaving out those who left the server
         sorted_players = sorted(
-            self.players["players"].values(),
+            (player for player in self.players.snapshot().values() if player.get("active", True)),
             key=lambda p: p["tasks_completed"],
             reverse=True
         )
@@ -167,14 +196,7 @@ class PlayerManager(commands.Cog):
                 value=f"Rank: {player['rank']}\nTasks Completed: {player['tasks_completed']}",
                 inline=False
             )
-
-        # Send or update the leaderboard message
-        async for message in channel.history(limit=10):
-            if message.author == self.bot.user and message.embeds:
-                await message.edit(embed=embed)
-                return
-
-        await channel.send(embed=embed)  # Send a new message if no previous one exists
+        return {"embed": embed}
 
 
 async def setup(bot):
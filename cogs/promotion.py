@@ -2,7 +2,8 @@ import discord
 from discord.ext import commands, tasks
 from discord.ui import View, Button
 from typing import Dict, List
-import json
+
+import config
 
 class PromotionCog(commands.Cog):
     """Cog to handle promotion recommendations and approvals."""
@@ -47,6 +48,7 @@ class PromotionCog(commands.Cog):
 
         # Keep track of recommendations and their approvals
         self.recommendations: Dict[int, Dict] = {}  # Key: Message ID
+        self.checked_war_points: Dict[str, int] = {}  # Player ID -> war points at the last check (low-footprint mode)
 
         # Start the auto-promotion check
         self.auto_promotion_check.start()
@@ -62,19 +64,27 @@ class PromotionCog(commands.Cog):
             return
 
         guild = self.bot.guilds[0]  # Adjust for multi-guild bots
-        player_data_path = "data/player_data.json"  # Path to player data JSON
 
-        # Load player data
-        try:
-            with open(player_data_path, "r") as file:
-                players = json.load(file)["players"]
-        except (FileNotFoundError, json.JSONDecodeError):
-            print("Player data file not found or invalid. Skipping auto-promotion check.")
-            return
+        # Read-only view of the shared player repository, no disk access
+        players = self.bot.players.snapshot()
+        if config.LOW_FOOTPRINT_MEMBERS:
+            # Members aren't cached, so only look up players still here whose war points moved since the last pass
+            players = {
+                player_id: data for player_id, data in players.items()
+                if data.get("active", True) and self.checked_war_points.get(player_id) != data["war_points"]
+            }
+            members = await self.bot.members.fetch_many(guild, [int(player_id) for player_id in players])
+            # Players whose member couldn't be fetched are retried next pass
+            self.checked_war_points.update(
+                (player_id, data["war_points"]) for player_id, data in players.items() if int(player_id) in members
+            )
+        else:
+            # Every member is cached; players who left simply aren't found, without any API call
+            members = {int(player_id): guild.get_member(int(player_id)) for player_id in players}
 
         # Check each player's war points against their current rank
         for player_id, data in players.items():
-            member = guild.get_member(int(player_id))
+            member = members.get(int(player_id))
             if not member:
                 continue
 
@@ -170,7 +180,7 @@ class PromotionCog(commands.Cog):
 
     async def promote_member(self, recommendation, message):
         """Promote a member to the next rank."""
-        member = message.guild.get_member(recommendation["member_id"])
+        member = await self.bot.members.fetch(message.guild, recommendation["member_id"])
         if not member:
             await message.channel.send("Member not found.", delete_after=10)
             return
@@ -187,6 +197,7 @@ class PromotionCog(commands.Cog):
 
         # Assign the new role
         await member.add_roles(new_role, reason="Promotion approved by officers.")
+        self.bot.members.discard(message.guild.id, member.id)  # Cached roles are stale now
 
         # Update the embed
         embed = message.embeds[0]
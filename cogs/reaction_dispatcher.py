@@ -0,0 +1,35 @@
+# reaction_dispatcher.py
+
+import logging
+
+from discord.ext import commands
+
+logger = logging.getLogger('discord.reaction_dispatcher')
+
+
+class ReactionDispatcher(commands.Cog):
+    """The bot's only reaction listener; routes raw reaction events through bot.reaction_routes."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.routes = bot.reaction_routes  # Shared routing table (see main.py)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        # Raw events also cover messages that aren't in the message cache (e.g. posted before a restart)
+        self.routes.stats["events"] += 1
+        handler = self.routes.get(payload.message_id)
+        if handler is None:
+            return  # Not a routed message: one dict probe and done
+        if payload.user_id == self.bot.user.id:
+            return  # Ignore reactions added by the bot itself
+
+        self.routes.stats["routed"] += 1
+        try:
+            await handler(payload)
+        except Exception as e:
+            logger.error(f"Reaction handler for message {payload.message_id} failed: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(ReactionDispatcher(bot))
@@ -2,10 +2,12 @@
 
 import discord
 from discord.ext import commands
-import json
 import asyncio
 import logging
 
+from utils.edit_coalescer import fingerprint
+from utils.inventory_store import CATEGORIES
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -16,57 +18,70 @@ logging.basicConfig(
 )
 logger = logging.getLogger('discord.stockpile_manager')
 
+OVERVIEW_TITLE = "Stockpile Contents Overview"
+OVERVIEW_PURPOSE = "stockpile_overview"  # Anchor purpose; shards are stored as "stockpile_overview:<hex>:<page>"
+
+# Discord embed limits
+EMBED_MAX_FIELDS = 25
+FIELD_VALUE_LIMIT = 1024
+EMBED_CHARACTER_BUDGET = 5500  # Embeds allow 6000 characters in total; the rest is left for the title
+
+
+def split_field_value(text, limit=FIELD_VALUE_LIMIT):
+    """Split text into chunks of at most limit characters, breaking between lines."""
+    chunks = []
+    current = ""
+    for line in text.split("\n"):
+        line = line[:limit]
+        if current and len(current) + 1 + len(line) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    chunks.append(current or "_No items_")
+    return chunks
+
+
+def paginate_fields(fields):
+    """Group (name, value) fields into pages that each fit in one embed."""
+    pages = [[]]
+    size = 0
+    for name, value in fields:
+        field_size = len(name) + len(value)
+        if pages[-1] and (len(pages[-1]) == EMBED_MAX_FIELDS or size + field_size > EMBED_CHARACTER_BUDGET):
+            pages.append([])
+            size = 0
+        pages[-1].append((name, value))
+        size += field_size
+    return pages
+
 class StockpileManagerCog(commands.Cog):
     """Cog to manage stockpile contents and maintain a summary embed."""
 
     def __init__(self, bot):
         self.bot = bot
-        self.flow_data_file = "data/flow_data.json"
-        self.categories = [
-            "small_arms", "heavy_arms", "heavy_ammunition",
-            "utility", "medical", "resource",
-            "uniform", "vehicle", "shippable_structure"
-        ]
+        self.flow_data = bot.flow_data  # Shared flow data cache (see main.py)
+        self.inventory = bot.inventory  # Stockpile contents, stored apart from the flow data
+        self.categories = CATEGORIES
         # Set this to the ID of the channel where you'd like the summary posted.
         self.stockpile_summary_channel_id = 1309638065559437375  # Replace with actual channel ID
 
-        # If you want this to persist across restarts, store and load from file/db.
+        # Overview messages are persisted per shard in bot.anchors. This only holds the
+        # single message posted before the overview was sharded, until it is adopted
         self.overview_message_id = None
+        self.overview_lock = asyncio.Lock()  # One overview update at a time
+        self.confirmed_shards = set()  # Shard message IDs known to exist this run (deletions drop their anchors)
 
         logger.info("StockpileManagerCog initialized.")
 
-    def load_flow_data(self):
-        """Load JSON data from the flow_data file."""
-        try:
-            with open(self.flow_data_file, "r") as file:
-                data = json.load(file)
-                return data
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.error(f"Error loading flow data: {e}")
-            return {}
-
-    def save_flow_data(self, flow_data):
-        """Save updated JSON data back to the file."""
-        try:
-            with open(self.flow_data_file, "w") as file:
-                json.dump(flow_data, file, indent=4)
-                logger.info("Flow data saved successfully.")
-        except Exception as e:
-            logger.error(f"Error saving flow data: {e}")
-
     def get_stockpile_data(self, stockpile_name):
         """Retrieve a stockpile entry by label from flow_data."""
-        flow_data = self.load_flow_data()
-        delivery_buttons = flow_data.get("delivery_selection", {}).get("buttons", [])
-        for btn in delivery_buttons:
-            if btn["label"].lower() == stockpile_name.lower():
-                return btn, flow_data
-        return None, flow_data
+        return self.flow_data.stockpile(stockpile_name)
 
     @commands.command(name="manage_stockpile")
     async def manage_stockpile(self, ctx, *, stockpile_name: str):
         """Command to manage a given stockpile by name."""
-        stockpile_data, flow_data = self.get_stockpile_data(stockpile_name)
+        stockpile_data = self.get_stockpile_data(stockpile_name)
         if not stockpile_data:
             await ctx.send(f"No stockpile found with the name `{stockpile_name}`.")
             return
@@ -90,9 +105,9 @@ class StockpileManagerCog(commands.Cog):
                 break
 
             if action == "add":
-                await self.handle_add(ctx, stockpile_data, flow_data)
+                await self.handle_add(ctx, stockpile_data)
             else:
-                await self.handle_remove(ctx, stockpile_data, flow_data)
+                await self.handle_remove(ctx, stockpile_data)
 
             # After modifications, update the overview
             await self.update_stockpile_overview()
@@ -114,7 +129,7 @@ class StockpileManagerCog(commands.Cog):
         # After loop ends, we update overview one final time to ensure all changes are reflected
         await self.update_stockpile_overview()
 
-    async def handle_add(self, ctx, stockpile_data, flow_data):
+    async def handle_add(self, ctx, stockpile_data):
         """Handle adding items to a chosen stockpile."""
         categories_list = '\n'.join([f"- `{cat.replace('_', ' ')}`" for cat in self.categories])
         await ctx.send(
@@ -154,13 +169,11 @@ class StockpileManagerCog(commands.Cog):
             await ctx.send("No items defined for this category. Please start over.")
             return
 
-        items_data = flow_data.get(next_step, {})
-        items_buttons = items_data.get("buttons", [])
-        if not items_buttons:
+        valid_items = self.flow_data.labels(next_step)
+        if not valid_items:
             await ctx.send("No items found for this category. Please start over.")
             return
 
-        valid_items = [btn["label"] for btn in items_buttons]
         items_list = '\n'.join([f"- `{itm}`" for itm in valid_items])
         await ctx.send(
             f"Select an item to add from `{chosen_category.replace('_', ' ')}`:\n"
@@ -198,22 +211,12 @@ class StockpileManagerCog(commands.Cog):
             await ctx.send("Quantity must be greater than zero. Please start over.")
             return
 
-        category_list = stockpile_data.get(chosen_category, [])
-        for itm in category_list:
-            if itm["name"].lower() == chosen_item.lower():
-                itm["quantity"] += quantity
-                break
-        else:
-            category_list.append({
-                "name": chosen_item,
-                "quantity": quantity
-            })
-        stockpile_data[chosen_category] = category_list
-        self.save_flow_data(flow_data)
+        # Single-row update in the inventory store
+        self.inventory.add(stockpile_data["label"], chosen_category, chosen_item, quantity)
 
         await ctx.send(f"Added `{quantity}` of `{chosen_item}` to `{chosen_category.replace('_', ' ')}`.")
 
-    async def handle_remove(self, ctx, stockpile_data, flow_data):
+    async def handle_remove(self, ctx, stockpile_data):
         """Handle removing items from a chosen stockpile."""
         categories_list = '\n'.join([f"- `{cat.replace('_', ' ')}`" for cat in self.categories])
         await ctx.send(
@@ -236,12 +239,13 @@ class StockpileManagerCog(commands.Cog):
             await ctx.send("Invalid category selected. Please start over.")
             return
 
-        category_list = stockpile_data.get(chosen_category, [])
+        stockpile_label = stockpile_data["label"]
+        category_list = self.inventory.items(stockpile_label, chosen_category)
         if not category_list:
             await ctx.send("This category is currently empty. Please start over.")
             return
 
-        current_items = '\n'.join([f"- `{itm['name']}` (Quantity: {itm['quantity']})" for itm in category_list])
+        current_items = '\n'.join([f"- `{name}` (Quantity: {quantity})" for name, quantity in category_list])
         await ctx.send(
             f"Current items in `{chosen_category.replace('_', ' ')}`:\n{current_items}\n"
             "Which item would you like to remove or reduce in quantity?\n"
@@ -258,19 +262,14 @@ class StockpileManagerCog(commands.Cog):
             await ctx.send("Timed out. Please try again.")
             return
 
-        chosen_item = item_msg.content.strip()
-        item_entry = None
-        for itm in category_list:
-            if itm["name"].lower() == chosen_item.lower():
-                item_entry = itm
-                break
-
-        if not item_entry:
+        item_name = self.inventory.find_item(stockpile_label, chosen_category, item_msg.content.strip())
+        if not item_name:
             await ctx.send("Invalid item selected. Please start over.")
             return
 
         await ctx.send(
-            f"Item `{item_entry['name']}` currently has quantity `{item_entry['quantity']}`.\n"
+            f"Item `{item_name}` currently has quantity "
+            f"`{self.inventory.get_quantity(stockpile_label, chosen_category, item_name)}`.\n"
             "Enter the quantity to remove (removing all or more will fully remove the item):"
         )
 
@@ -289,72 +288,148 @@ class StockpileManagerCog(commands.Cog):
             await ctx.send("Quantity must be greater than zero. Please start over.")
             return
 
-        if remove_qty >= item_entry["quantity"]:
-            category_list.remove(item_entry)
-            await ctx.send(f"Removed all `{item_entry['name']}` from `{chosen_category.replace('_', ' ')}`.")
+        # Single-row update in the inventory store; the row is dropped when nothing remains
+        remaining = self.inventory.remove(stockpile_label, chosen_category, item_name, remove_qty)
+        if remaining == 0:
+            await ctx.send(f"Removed all `{item_name}` from `{chosen_category.replace('_', ' ')}`.")
         else:
-            item_entry["quantity"] -= remove_qty
-            await ctx.send(f"Reduced `{item_entry['name']}` by `{remove_qty}`, now `{item_entry['quantity']}` remain.")
-
-        stockpile_data[chosen_category] = category_list
-        self.save_flow_data(flow_data)
+            await ctx.send(f"Reduced `{item_name}` by `{remove_qty}`, now `{remaining}` remain.")
 
         await ctx.send("Stockpile updated successfully.")
 
-    async def update_stockpile_overview(self):
-        """Update or create a message in the designated channel listing all stockpiles and their contents in an embed."""
-        flow_data = self.load_flow_data()
-        delivery_buttons = flow_data.get("delivery_selection", {}).get("buttons", [])
-
-        embed = discord.Embed(
-            title="Stockpile Contents Overview",
-            description="Below is a list of all available stockpiles and their categorized contents.",
-            color=discord.Color.blue()
-        )
-
+    def stockpile_text(self, stockpile_name):
+        """Return the categorized contents of one stockpile as embed text."""
+        lines = []
+        for cat, cat_list in self.inventory.stockpile_contents(stockpile_name).items():
+            cat_display_name = cat.replace('_', ' ').title()
+            lines.append(f"**{cat_display_name}:**")
+            for name, quantity in cat_list:
+                lines.append(f"- {name} (x{quantity})")
+            lines.append("")  # spacing
+        return "\n".join(lines).strip() or "_No items_"
+
+    def render_overview_shards(self):
+        """Return {shard key: embed}, one shard per hex page, in display order.
+
+        Stockpiles are grouped by hex. A stockpile longer than one field
+        continues in the next field, and a hex that outgrows one embed is
+        split into pages, so no Discord embed limit is ever exceeded.
+        """
+        delivery_buttons = self.flow_data.buttons("delivery_selection")
         if not delivery_buttons:
+            embed = discord.Embed(title=OVERVIEW_TITLE, color=discord.Color.blue())
             embed.add_field(name="No Stockpiles", value="_No stockpiles available._", inline=False)
-        else:
-            for btn in delivery_buttons:
-                stockpile_name = btn["label"]
-                lines = []
-                for cat in self.categories:
-                    cat_list = btn.get(cat, [])
-                    if cat_list:
-                        cat_display_name = cat.replace('_', ' ').title()
-                        lines.append(f"**{cat_display_name}:**")
-                        for itm in cat_list:
-                            lines.append(f"- {itm['name']} (x{itm['quantity']})")
-                        lines.append("")  # spacing
-
-                stockpile_text = "\n".join(lines).strip()
-                if not stockpile_text:
-                    stockpile_text = "_No items_"
-                embed.add_field(name=stockpile_name, value=stockpile_text, inline=False)
+            return {"empty": embed}
+
+        by_hex = {}
+        for btn in delivery_buttons:
+            by_hex.setdefault(btn.get("hex") or "Unknown Hex", []).append(btn["label"])
+
+        shards = {}
+        for hex_name, stockpile_names in by_hex.items():
+            fields = []
+            for stockpile_name in stockpile_names:
+                for i, chunk in enumerate(split_field_value(self.stockpile_text(stockpile_name))):
+                    fields.append((stockpile_name if i == 0 else f"{stockpile_name} (cont.)", chunk))
+            pages = paginate_fields(fields)
+            for number, page in enumerate(pages, start=1):
+                title = f"Stockpile Contents: {hex_name}"
+                if len(pages) > 1:
+                    title += f" ({number}/{len(pages)})"
+                embed = discord.Embed(title=title, color=discord.Color.blue())
+                for name, value in page:
+                    embed.add_field(name=name, value=value, inline=False)
+                shards[f"{hex_name}:{number}"] = embed
+        return shards
 
+    async def update_stockpile_overview(self):
+        """Bring the overview messages in the summary channel up to date, one message per shard.
+
+        Each shard's content hash is kept with its anchor, so only shards whose
+        stockpiles changed are edited, also right after a restart. An unchanged
+        shard is fetched once per run to confirm it wasn't deleted while the
+        bot was offline. A shard that fails is logged and retried next update.
+        """
         channel = self.bot.get_channel(self.stockpile_summary_channel_id)
         if not channel:
             logger.error("Stockpile summary channel not found. Cannot update overview.")
             return
 
-        if self.overview_message_id is not None:
-            try:
-                msg = await channel.fetch_message(self.overview_message_id)
-                await msg.edit(embed=embed)
-            except discord.NotFound:
-                new_msg = await channel.send(embed=embed)
-                self.overview_message_id = new_msg.id
-        else:
-            new_msg = await channel.send(embed=embed)
-            self.overview_message_id = new_msg.id
-
-        logger.info("Stockpile overview updated with an embed.")
-
-    @commands.Cog.listener()
-    async def on_ready(self):
-        """Update the overview message when the bot starts."""
-        # Wait a moment for the bot to fully connect and fetch channels
-        await asyncio.sleep(5)
+        async with self.overview_lock:
+            shards = self.render_overview_shards()
+            existing = self.bot.anchors.find(channel.guild.id, f"{OVERVIEW_PURPOSE}:")
+            edited = 0
+            for key, embed in shards.items():
+                purpose = f"{OVERVIEW_PURPOSE}:{key}"
+                content_hash = fingerprint(embed=embed)
+                entry = existing.pop(purpose, None)
+                if entry is None and self.overview_message_id is not None:
+                    # The single overview message from before sharding becomes the first shard
+                    entry = {"channel_id": channel.id, "message_id": self.overview_message_id}
+                    self.overview_message_id = None
+                    self.bot.anchors.remove(channel.guild.id, OVERVIEW_PURPOSE)
+
+                if entry is not None and entry["channel_id"] == channel.id:
+                    unchanged = entry.get("hash") == content_hash
+                    if unchanged and entry["message_id"] in self.confirmed_shards:
+                        continue
+                    # Edit through a handle: no fetch_message round-trip before each edit
+                    message = self.bot.message_handles.get(channel.id, entry["message_id"])
+                    try:
+                        if unchanged:
+                            await message.fetch()
+                        else:
+                            await self.bot.editor.edit(message, embed=embed)
+                    except discord.NotFound:
+                        self.bot.message_handles.discard(entry["message_id"])
+                    except discord.HTTPException as e:
+                        logger.warning(f"Could not update overview shard {key}: {e}")
+                        continue
+                    else:
+                        self.confirmed_shards.add(entry["message_id"])
+                        self.bot.anchors.set(channel, purpose, entry["message_id"], content_hash=content_hash)
+                        if not unchanged:
+                            edited += 1
+                        continue
+
+                try:
+                    new_msg = await channel.send(embed=embed)
+                except discord.HTTPException as e:
+                    logger.warning(f"Could not post overview shard {key}: {e}")
+                    continue
+                self.confirmed_shards.add(new_msg.id)
+                self.bot.editor.remember(new_msg.id, embed=embed)
+                self.bot.anchors.set(channel, purpose, new_msg.id, content_hash=content_hash)
+                edited += 1
+
+            # Shards that no longer exist, e.g. a hex without stockpiles or fewer pages
+            removed = 0
+            for purpose, entry in existing.items():
+                try:
+                    await self.bot.message_handles.get(entry["channel_id"], entry["message_id"]).delete()
+                except discord.NotFound:
+                    pass
+                except discord.HTTPException as e:
+                    # Keep the anchor so the next update tries again
+                    logger.warning(f"Could not delete overview shard {purpose}: {e}")
+                    continue
+                self.bot.message_handles.discard(entry["message_id"])
+                self.bot.anchors.remove(channel.guild.id, purpose)
+                removed += 1
+
+        logger.info(f"Stockpile overview updated: {edited} of {len(shards)} shards changed, {removed} removed.")
+
+    async def warmup(self):
+        """Update the overview messages when the bot starts (run once by bot.startup)."""
+        channel = self.bot.get_channel(self.stockpile_summary_channel_id)
+        if channel and not self.bot.anchors.find(channel.guild.id, f"{OVERVIEW_PURPOSE}:"):
+            # Adopt the single overview message from before sharding instead of leaving it behind
+            self.overview_message_id = await self.bot.anchors.resolve(
+                channel,
+                OVERVIEW_PURPOSE,
+                lambda message: message.embeds and message.embeds[0].title == OVERVIEW_TITLE,
+                limit=50,
+            )
         await self.update_stockpile_overview()
         logger.info("Stockpile overview updated on bot start.")
 
@@ -0,0 +1,399 @@
+# task_board.py
+
+import logging
+from collections import OrderedDict
+
+import discord
+from discord.ext import commands
+
+import config
+from utils.task_manager import HIDDEN_TASK_KEYS, VERSION_KEY
+from utils.task_stores import FINISHED_STATUSES
+
+logger = logging.getLogger('discord.task_board')
+
+STATUS_COLORS = {
+    "Pending": discord.Color.red(),
+    "In Progress": discord.Color.gold(),
+    "Completed": discord.Color.green(),
+    "Abandoned": discord.Color.dark_red(),
+}
+
+# Action -> (label, emoji, style)
+TASK_ACTIONS = {
+    "accept": ("Accept", "🖐️", discord.ButtonStyle.primary),
+    "complete": ("Complete", "✅", discord.ButtonStyle.success),
+    "abandon": ("Abandon", "🛑", discord.ButtonStyle.danger),
+}
+ORDER_ACTIONS = {
+    "claim_next": ("Claim next slice", "🖐️", discord.ButtonStyle.primary),
+    "complete": ("Complete my slice", "✅", discord.ButtonStyle.success),
+    "abandon": ("Abandon my slice", "🛑", discord.ButtonStyle.danger),
+}
+
+# Reactions on task posts from before the buttons
+REACTION_ACTIONS = {"🖐️": "accept", "✅": "complete", "🛑": "abandon"}
+
+STATUS_ICONS = {"Pending": "🟥", "In Progress": "🟨", "Completed": "🟩", "Abandoned": "⬛"}
+ORDER_DESCRIPTION_LIMIT = 4000  # Discord caps embed descriptions at 4096 characters
+
+
+class RenderCache:
+    """Bounded LRU of rendered embeds, keyed by the Task IDs and versions they were built from.
+
+    A task's version changes on every update_task, so a hit is always current.
+    Cached embeds are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_size=config.TASK_EMBED_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()  # (kind, ((Task ID, version), ...)) -> Embed
+        self.stats = {"hits": 0, "misses": 0, "uncached": 0}
+
+    @staticmethod
+    def key(kind, tasks):
+        """Return the cache key for rendering tasks, or None if a task has no version yet."""
+        versions = []
+        for task in tasks:
+            version = task.get(VERSION_KEY)
+            if version is None:
+                return None
+            versions.append((task["Task ID"], version))
+        return kind, tuple(sorted(versions))
+
+    def get_or_render(self, kind, tasks, render):
+        key = self.key(kind, tasks)
+        if key is None:
+            self.stats["uncached"] += 1
+            return render()
+        embed = self.entries.get(key)
+        if embed is not None:
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return embed
+        self.stats["misses"] += 1
+        embed = self.entries[key] = render()
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return embed
+
+    def get_stats(self):
+        return dict(self.stats, cached=len(self.entries))
+
+
+render_cache = RenderCache()
+
+
+def task_embed(task):
+    """Return the task board embed for a task (cached per task version)."""
+    return render_cache.get_or_render("task", (task,), lambda: _render_task_embed(task))
+
+
+def _render_task_embed(task):
+    task_description = "\n".join(
+        [f"- **{key}:** {value}" for key, value in task.items() if key not in HIDDEN_TASK_KEYS]
+    )
+    return discord.Embed(
+        title="Task Status: " + task["Status"],
+        description=task_description,
+        color=STATUS_COLORS.get(task["Status"], discord.Color.default()),
+    )
+
+
+def task_view(task):
+    """Build the persistent Accept/Complete/Abandon buttons, enabled according to the task's status."""
+    status = task["Status"]
+    enabled = {
+        "accept": status == "Pending",
+        "complete": status == "In Progress",
+        "abandon": status in ("Pending", "In Progress"),
+    }
+    view = discord.ui.View(timeout=None)
+    for action in TASK_ACTIONS:
+        view.add_item(TaskActionButton(action, task["Task ID"], disabled=not enabled[action]))
+    return view
+
+
+class TaskActionButton(discord.ui.DynamicItem[discord.ui.Button], template=r"task:(?P<action>accept|complete|abandon):(?P<task_id>[\w-]+)"):
+    """A task board button. The custom_id carries the action and Task ID, so it keeps working after restarts."""
+
+    def __init__(self, action, task_id, disabled=False):
+        label, emoji, style = TASK_ACTIONS[action]
+        super().__init__(
+            discord.ui.Button(
+                label=label,
+                emoji=emoji,
+                style=style,
+                custom_id=f"task:{action}:{task_id}",
+                disabled=disabled,
+            )
+        )
+        self.action = action
+        self.task_id = task_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["action"], match["task_id"])
+
+    async def callback(self, interaction):
+        cog = interaction.client.get_cog("TaskBoard")
+        if cog is None:
+            await interaction.response.send_message("The task board is unavailable right now.", ephemeral=True)
+            return
+        await cog.handle_action(interaction, self.action, self.task_id)
+
+
+def slice_number(task):
+    """Return a slice's position within its order line ("3/100" -> 3)."""
+    return int(str(task.get("Slice", "0")).split("/")[0])
+
+
+def order_embed(tasks):
+    """Return the aggregated embed for one mass-order line (cached per slice versions)."""
+    return render_cache.get_or_render("order", tasks, lambda: _render_order_embed(tasks))
+
+
+def _render_order_embed(tasks):
+    """Build the aggregated embed: a summary plus one line per slice."""
+    tasks = sorted(tasks, key=slice_number)
+    first = tasks[0]
+    finished = sum(task["Status"] in ("Completed", "Abandoned") for task in tasks)
+    claimed = sum(task["Status"] == "In Progress" for task in tasks)
+    total = sum(task["Quantity"] for task in tasks if isinstance(task.get("Quantity"), int))
+    if finished == len(tasks):
+        color = discord.Color.green()
+    elif claimed:
+        color = discord.Color.gold()
+    else:
+        color = discord.Color.red()
+
+    lines = [
+        f"- **Category:** {first.get('Category')}",
+        f"- **Delivery Location:** {first.get('Delivery Location')}",
+        f"- **Created by:** {first.get('Created by')}",
+        f"- **Progress:** {finished}/{len(tasks)} slices done, {claimed} claimed",
+        "",
+    ]
+    length = sum(len(line) + 1 for line in lines)
+    for shown, task in enumerate(tasks):
+        line = f"{STATUS_ICONS.get(task['Status'], '')} `#{slice_number(task)}` {task.get('Quantity')} · {task['Status']}"
+        if task.get("Assigned to"):
+            line += f" · {task['Assigned to']}"
+        length += len(line) + 1
+        if length > ORDER_DESCRIPTION_LIMIT:
+            lines.append(f"… and {len(tasks) - shown} more slices")
+            break
+        lines.append(line)
+    return discord.Embed(
+        title=f"Mass Order: {total} x {first.get('Item Needed')}",
+        description="\n".join(lines),
+        color=color,
+    )
+
+
+def order_view(tasks):
+    """Build the claim menu and buttons for an aggregated mass-order post."""
+    tasks = sorted(tasks, key=slice_number)
+    open_slices = [task for task in tasks if task["Status"] == "Pending" and not task.get("Assigned to")]
+    any_claimed = any(task["Status"] == "In Progress" for task in tasks)
+
+    view = discord.ui.View(timeout=None)
+    view.add_item(OrderSliceSelect(open_slices))
+    view.add_item(OrderActionButton("claim_next", disabled=not open_slices))
+    view.add_item(OrderActionButton("complete", disabled=not any_claimed))
+    view.add_item(OrderActionButton("abandon", disabled=not any_claimed))
+    return view
+
+
+class OrderSliceSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"order:claim"):
+    """Select menu listing up to 25 open slices of an order line; picking one claims it."""
+
+    def __init__(self, open_slices=()):
+        options = [
+            discord.SelectOption(
+                label=f"Slice {task.get('Slice')}: {task.get('Quantity')} x {task.get('Item Needed')}"[:100],
+                value=task["Task ID"],
+            )
+            for task in list(open_slices)[:25]
+        ]
+        super().__init__(
+            discord.ui.Select(
+                custom_id="order:claim",
+                placeholder="Claim a slice..." if options else "All slices are claimed",
+                # A select needs at least one option, even when disabled
+                options=options or [discord.SelectOption(label="No open slices", value="none")],
+                disabled=not options,
+                row=0,
+            )
+        )
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls()
+
+    async def callback(self, interaction):
+        cog = interaction.client.get_cog("TaskBoard")
+        if cog is None:
+            await interaction.response.send_message("The task board is unavailable right now.", ephemeral=True)
+            return
+        await cog.handle_order_action(interaction, "claim", self.item.values[0])
+
+
+class OrderActionButton(discord.ui.DynamicItem[discord.ui.Button], template=r"order:(?P<action>claim_next|complete|abandon)"):
+    """Claim the next open slice, or complete/abandon your own claimed slice, on an aggregated post."""
+
+    def __init__(self, action, disabled=False):
+        label, emoji, style = ORDER_ACTIONS[action]
+        super().__init__(
+            discord.ui.Button(label=label, emoji=emoji, style=style, custom_id=f"order:{action}", disabled=disabled, row=1)
+        )
+        self.action = action
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["action"])
+
+    async def callback(self, interaction):
+        cog = interaction.client.get_cog("TaskBoard")
+        if cog is None:
+            await interaction.response.send_message("The task board is unavailable right now.", ephemeral=True)
+            return
+        await cog.handle_order_action(interaction, self.action)
+
+
+class TaskBoard(commands.Cog):
+    """Handles the task board buttons for every task post."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.task_manager = bot.task_manager  # Shared task repository (see main.py)
+        self.players = bot.players  # Shared player repository (see main.py)
+        self.routes = bot.reaction_routes  # Reaction routing table (see cogs/reaction_dispatcher.py)
+
+    async def cog_load(self):
+        # One dynamic handler serves the buttons of every task message, old and new
+        self.bot.add_dynamic_items(TaskActionButton, OrderSliceSelect, OrderActionButton)
+        # Route reactions on every open single-task post
+        for message_id in list(self.task_manager.message_index):
+            if self.task_manager.get_task_by_message_id(message_id) is not None:
+                self.routes.register(message_id, self.on_task_reaction)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(TaskActionButton, OrderSliceSelect, OrderActionButton)
+        for message_id, handler in list(self.routes.handlers.items()):
+            if handler == self.on_task_reaction:
+                self.routes.unregister(message_id)
+
+    @commands.Cog.listener()
+    async def on_task_update(self, task, event):
+        """Keep the reaction routes in step with task posts."""
+        message_id = task.get("Message ID")
+        if message_id is None:
+            return
+        if task["Status"] in FINISHED_STATUSES:
+            self.routes.unregister(message_id)
+        elif self.task_manager.get_task_by_message_id(message_id) is not None:
+            self.routes.register(message_id, self.on_task_reaction)
+
+    async def on_task_reaction(self, payload):
+        """Apply a reaction on a task post; these predate the buttons but still work."""
+        task = self.task_manager.get_task_by_message_id(payload.message_id)
+        if task is None:
+            return
+        # Reacting and editing only need a handle, not the fetched message
+        message = self.bot.message_handles.get(payload.channel_id, payload.message_id)
+        action = REACTION_ACTIONS.get(str(payload.emoji))
+        if action is None:
+            # Remove the reaction if it's not one of the expected ones
+            await message.remove_reaction(payload.emoji, discord.Object(id=payload.user_id))
+            return
+        user = payload.member or self.bot.get_user(payload.user_id)
+        if user is None:
+            return
+        if self.apply_action(task, action, user) is None:
+            # Editing also swaps the reactions for the task board buttons
+            self.bot.editor.edit(message, embed=task_embed(task), view=task_view(task))
+            logger.info(f"Task {task['Task ID']}: {action} by {user} via reaction")
+
+    async def handle_action(self, interaction, action, task_id):
+        """Apply a button press and edit the task message in the same interaction response."""
+        task = await self.task_manager.get_task_async(task_id)
+        if task is None:
+            await interaction.response.send_message("This task no longer exists.", ephemeral=True)
+            return
+
+        error = self.apply_action(task, action, interaction.user)
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
+            return
+
+        embed, view = task_embed(task), task_view(task)
+        await interaction.response.edit_message(embed=embed, view=view)
+        self.bot.editor.remember(interaction.message.id, embed=embed, view=view)
+        logger.info(f"Task {task_id}: {action} by {interaction.user}")
+
+    async def handle_order_action(self, interaction, action, task_id=None):
+        """Apply a claim/complete/abandon on an aggregated mass-order post and edit it in place."""
+        tasks = sorted(await self.task_manager.get_tasks_by_message_id_async(interaction.message.id), key=slice_number)
+        if not tasks:
+            await interaction.response.send_message("This order no longer exists.", ephemeral=True)
+            return
+
+        user = interaction.user
+        if action == "claim":
+            task = next((task for task in tasks if task["Task ID"] == task_id), None)
+            task_action = "accept"
+        elif action == "claim_next":
+            task = next((task for task in tasks if task["Status"] == "Pending" and not task.get("Assigned to")), None)
+            task_action = "accept"
+        else:
+            # Complete/abandon act on the user's own oldest claimed slice
+            task = next((task for task in tasks if task["Status"] == "In Progress" and task.get("Assigned to") == user.name), None)
+            task_action = action
+        if task is None:
+            message = "You have no claimed slices on this order." if action in ("complete", "abandon") else "That slice is no longer open."
+            await interaction.response.send_message(message, ephemeral=True)
+            return
+
+        error = self.apply_action(task, task_action, user)
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
+            return
+
+        embed, view = order_embed(tasks), order_view(tasks)
+        await interaction.response.edit_message(embed=embed, view=view)
+        self.bot.editor.remember(interaction.message.id, embed=embed, view=view)
+        logger.info(f"Order slice {task['Task ID']}: {task_action} by {user}")
+
+    def apply_action(self, task, action, user):
+        """Apply a task transition for user. Returns an error message, or None on success."""
+        status = task["Status"]
+        assignee = task.get("Assigned to")
+        if action == "accept":
+            if assignee:
+                return f"This task is already assigned to {assignee}."
+            if status != "Pending":
+                return "This task is already closed."
+            task["Status"] = "In Progress"
+            task["Assigned to"] = user.name
+        elif action == "complete":
+            if status != "In Progress" or assignee != user.name:
+                return "You are not assigned to this task."
+            task["Status"] = "Completed"
+            self.players.increment_tasks_completed(user.id)
+            self.players.add_war_points(user.id, 1)
+        elif action == "abandon":
+            if status not in ("Pending", "In Progress"):
+                return "This task is already closed."
+            if assignee and assignee != user.name:
+                return f"You cannot abandon this task, it is assigned to {assignee}."
+            task["Status"] = "Abandoned"
+            task["Assigned to"] = None
+        else:
+            return "Unknown action."
+        self.task_manager.update_task(task["Task ID"], task)
+        return None
+
+
+async def setup(bot):
+    await bot.add_cog(TaskBoard(bot))
@@ -1,89 +1,24 @@
 import discord
 from discord.ext import commands
-import json
 import uuid
 
-
-class TaskManager:
-    """Manages tasks and their interactions."""
-
-    def __init__(self):
-        self.tasks = {}
-        self.load_tasks()
-
-    def load_tasks(self):
-        try:
-            with open("data/tasks.json", "r") as file:
-                task_list = json.load(file)
-            self.tasks = {task["Task ID"]: task for task in task_list}
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.tasks = {}
-
-    def save_tasks(self):
-        with open("data/tasks.json", "w") as file:
-            json.dump(list(self.tasks.values()), file, indent=4)
-
-    def update_task(self, task_id, task_data):
-        self.tasks[task_id] = task_data
-        self.save_tasks()
-
-    def get_task(self, task_id):
-        return self.tasks.get(task_id)
-
-    def get_task_by_message_id(self, message_id):
-        for task in self.tasks.values():
-            if task.get("Message ID") == message_id:
-                return task
-        return None
-
-    def get_all_tasks(self):
-        return self.tasks.values()
+from cogs.task_board import render_cache, task_embed, task_view
 
 
 class FlowManagerCog(commands.Cog):
-    """Cog to manage reaction-based task flows."""
+    """Cog to manage button-driven task creation flows."""
 
     def __init__(self, bot):
         self.bot = bot
-        self.flow_data = self.load_json("data/flow_data.json")  # Load flow data from JSON
+        self.flow_data = bot.flow_data  # Shared flow data cache (see main.py)
         self.user_states = {}  # Track user progress in flows
         self.user_messages = {}  # Track user specific messages for cleanup
         self.dashboard_message_id = None  # Store the ID of the persistent dashboard message
-        self.task_manager = TaskManager()  # Initialize the task manager
-        self.player_data_path = "data/player_data.json" # Path to player data JSON
-        self.player_data = self.load_player_data() # Load player data from JSON
+        self.task_manager = bot.task_manager  # Shared task repository (see main.py)
+        self.players = bot.players  # Shared player repository (see main.py)
 
-    def load_player_data(self):
-        """Load player data from the JSON file."""
-        try:
-            with open(self.player_data_path, "r") as file:
-                return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {"players": {}}
-
-    def save_player_data(self):
-        """Save the updated player data to the JSON file."""
-        with open(self.player_data_path, "w") as file:
-            json.dump(self.player_data, file, indent=4)
-
-    @staticmethod
-    def load_json(file_path):
-        """Load JSON data from a file."""
-        with open(file_path, "r") as file:
-            return json.load(file)
-        
-    def load_flow_data(self):
-        """Load flow data from JSON file."""
-        try:
-            with open("data/flow_data.json", "r") as file:
-                self.flow_data = json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading flow data: {e}")
-            self.flow_data = {}
-
-    @commands.Cog.listener()
-    async def on_ready(self):
-        """Ensure the dashboard message is present on bot startup."""
+    async def warmup(self):
+        """Ensure the dashboard message is present on bot startup (run once by bot.startup)."""
         dashboard_channel_id = 1311021240386981928  # Replace with your dashboard channel ID
         dashboard_channel = self.bot.get_channel(dashboard_channel_id)
 
@@ -94,12 +29,14 @@ class FlowManagerCog(commands.Cog):
         # Register the dashboard view
         self.bot.add_view(self.create_dashboard_view())
 
-        # Check if the dashboard message already exists
-        async for message in dashboard_channel.history(limit=10):
-            if message.author == self.bot.user and message.embeds and message.embeds[0].title == "Create Task Dashboard":
-                self.dashboard_message_id = message.id
-                break
-        else:
+        # Check if the dashboard message already exists (anchor registry, history scan as fallback)
+        self.dashboard_message_id = await self.bot.anchors.resolve(
+            dashboard_channel,
+            "task_dashboard",
+            lambda message: message.embeds and message.embeds[0].title == "Create Task Dashboard",
+            limit=10,
+        )
+        if self.dashboard_message_id is None:
             # If no dashboard message exists, create one
             view = self.create_dashboard_view()
             embed = discord.Embed(
@@ -116,18 +53,19 @@ class FlowManagerCog(commands.Cog):
                     "1. 🟥 **Pending**: Task is awaiting someone to accept it.\n"
                     "2. 🟨 **In Progress**: Task is accepted and being worked on.\n"
                     "3. 🟩 **Completed**: Task has been successfully finished.\n\n"
-                    "You can manage tasks using reactions attached to each task post."
+                    "You can manage tasks using the Accept, Complete and Abandon buttons on each task post."
                 ),
                 color=discord.Color.blue()
             )
             embed.set_footer(text="Click a button below to start creating tasks.")
             dashboard_message = await dashboard_channel.send(embed=embed, view=view)
             self.dashboard_message_id = dashboard_message.id
+            self.bot.anchors.set(dashboard_channel, "task_dashboard", dashboard_message.id)
 
     def create_dashboard_view(self):
         """Create the view for the dashboard buttons."""
         view = discord.ui.View(timeout=None)
-        for button_data in self.flow_data["dashboard"]["buttons"]:
+        for button_data in self.flow_data.buttons("dashboard"):
             button = discord.ui.Button(
                 label=button_data["label"],
                 custom_id=button_data["custom_id"],
@@ -140,7 +78,6 @@ class FlowManagerCog(commands.Cog):
     def start_user_flow(self, button_data):
         """Create a callback to start a user-specific flow."""
         async def button_callback(interaction: discord.Interaction):
-            self.load_flow_data()  # Reload flow data in case it was updated
             user_id = interaction.user.id
             next_step = button_data.get("next_step")
 
@@ -164,8 +101,7 @@ class FlowManagerCog(commands.Cog):
 
     async def show_step(self, interaction, step_name):
         """Show a step based on the JSON and user state."""
-        self.load_flow_data()  # Reload flow data in case it was updated
-        step_data = self.flow_data.get(step_name)
+        step_data = self.flow_data.step(step_name)  # Re-parsed only if the file changed
         if not step_data:
             await interaction.channel.send("Error: Step not found.")
             return
@@ -285,52 +221,17 @@ class FlowManagerCog(commands.Cog):
                 "Status": "Pending",
             }
 
-        # Function to get embed color based on task status
-        def get_status_color(status):
-            colors = {
-                "Pending": discord.Color.red(),
-                "In Progress": discord.Color.yellow(),
-                "Completed": discord.Color.green(),
-            }
-            return colors.get(status, discord.Color.default())
-
-        # Define the task embed
-        def create_embed():
-            task_description = "\n".join(
-                [f"- **{key}:** {value}" for key, value in task.items() if key not in ('Message ID', 'Task ID')]
-            )
-            embed = discord.Embed(
-                title="Task Status: " + task["Status"],
-                description=task_description,
-                color=get_status_color(task["Status"])
-            )
-            embed.add_field(
-                name="Actions",
-                value=(
-                    "React with:\n"
-                    "🖐️ to **Accept** the task\n"
-                    "✅ to **Complete** the task\n"
-                    "🛑 to **Abandon** the task"
-                ),
-                inline=False
-            )
-            return embed
-
-        # Post the task to the task board
-        embed = create_embed()
-        message = await task_channel.send(embed=embed)
-
-        # Add reactions to the message
-        await message.add_reaction("🖐️")  # Accept Task
-        await message.add_reaction("✅")  # Complete Task
-        await message.add_reaction("🛑")  # Abandon Task
-
-        # Save the message ID to the task
-        task["Message ID"] = message.id
-
         # Save the task using TaskManager
         self.task_manager.update_task(task_id, task)
 
+        def on_posted(message):
+            # Save the message ID to the task
+            task["Message ID"] = message.id
+            self.task_manager.update_task(task_id, task)
+
+        # Queue the post to the task board; the buttons cost nothing extra
+        self.bot.poster.submit(task_channel, on_posted=on_posted, embed=task_embed(task), view=task_view(task))
+
         # Cleanup previous user message
         user_id = interaction.user.id
         if user_id in self.user_messages and self.user_messages[user_id]:
@@ -341,129 +242,46 @@ class FlowManagerCog(commands.Cog):
             except AttributeError:
                 pass
 
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload):
-        if payload.user_id == self.bot.user.id:
-            return  # Ignore reactions added by the bot itself
-
-        # Get the message ID and check if it matches a task
-        message_id = payload.message_id
-        task = self.task_manager.get_task_by_message_id(message_id)
-        if not task:
-            return  # Not a task message
-
-        # Get the emoji used
-        emoji = str(payload.emoji)
-
-        # Fetch the channel and message
-        channel = self.bot.get_channel(payload.channel_id)
-        if not channel:
-            return
-        try:
-            message = await channel.fetch_message(message_id)
-        except discord.NotFound:
-            return
-
-        user = self.bot.get_user(payload.user_id)
-        if not user:
-            return
-
-        # Handle the reaction
-        await self.handle_task_reaction(task, message, emoji, user)
-
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload):
-        if payload.user_id == self.bot.user.id:
-            return  # Ignore reactions added by the bot itself
-
-        # Get the message ID and check if it matches a task
-        message_id = payload.message_id
-        task = self.task_manager.get_task_by_message_id(message_id)
-        if not task:
-            return  # Not a task message
-
-        # Get the emoji used
-        emoji = str(payload.emoji)
-
-        # Fetch the channel and message
-        channel = self.bot.get_channel(payload.channel_id)
-        if not channel:
+    @commands.command(name="task_store_stats")
+    async def task_store_stats(self, ctx):
+        """Show task persistence statistics (dirty count and flush latency) and embed cache hits."""
+        stats = self.task_manager.get_stats()
+        stats.update({f"embed_cache_{key}": value for key, value in render_cache.get_stats().items()})
+        embed = discord.Embed(title="Task Store Stats", color=discord.Color.blue())
+        for key, value in stats.items():
+            embed.add_field(name=key.replace('_', ' ').title(), value=str(value), inline=True)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="task_history")
+    async def task_history(self, ctx, member: discord.Member = None, month: str = None):
+        """Show archived tasks, optionally for one member and/or one month (YYYY-MM)."""
+        filters = {"assigned_to": member.name} if member else {}
+        tasks = await self.bot.task_archiver.query(limit=20, since=month, until=month, **filters)
+        if not tasks:
+            await ctx.send("No archived tasks found.")
             return
-        try:
-            message = await channel.fetch_message(message_id)
-        except discord.NotFound:
-            return
-
-        user = self.bot.get_user(payload.user_id)
-        if not user:
-            return
-
-        # Handle the reaction
-        await self.handle_task_reaction(task, message, emoji, user)
-
-    async def handle_task_reaction(self, task, message, emoji, user):
-        if emoji == "✅":  # Complete Task
-            if task["Status"] == "In Progress" and task["Assigned to"] == user.name:
-                task["Status"] = "Completed"
-
-                # Increment the user's task completion count
-                player_id = str(user.id)
-                if player_id in self.player_data["players"]:
-                    self.player_data["players"][player_id]["tasks_completed"] += 1
-                    self.player_data["players"][player_id]["war_points"] += 1
-                    self.save_player_data()
-
-                # Update the task
-                self.task_manager.update_task(task["Task ID"], task)
-                await self.update_task_message(task, message)
-        elif emoji == "🖐️":  # Accept Task
-            if task["Status"] == "Pending":
-                task["Status"] = "In Progress"
-                task["Assigned to"] = user.name
-                self.task_manager.update_task(task["Task ID"], task)
-                await self.update_task_message(task, message)
-        elif emoji == "🛑":  # Abandon Task
-            if task["Status"] == "In Progress" and task["Assigned to"] == user.name:
-                task["Status"] = "Pending"
-                task["Assigned to"] = None
-                self.task_manager.update_task(task["Task ID"], task)
-                await self.update_task_message(task, message)
-        else:
-            # Remove the reaction if it's not one of the expected ones
-            await message.remove_reaction(emoji, user)
-
-    async def update_task_message(self, task, message):
-        # Function to get embed color based on task status
-        def get_status_color(status):
-            colors = {
-                "Pending": discord.Color.red(),
-                "In Progress": discord.Color.yellow(),
-                "Completed": discord.Color.green(),
-            }
-            return colors.get(status, discord.Color.default())
-
-        # Create the updated embed
-        task_description = "\n".join(
-            [f"- **{key}:** {value}" for key, value in task.items() if key not in ('Message ID', 'Task ID')]
-        )
-        embed = discord.Embed(
-            title="Task Status: " + task["Status"],
-            description=task_description,
-            color=get_status_color(task["Status"])
-        )
-        embed.add_field(
-            name="Actions",
-            value=(
-                "React with:\n"
-                "🖐️ to **Accept** the task\n"
-                "✅ to **Complete** the task\n"
-                "🛑 to **Abandon** the task"
-            ),
-            inline=False
-        )
-
-        # Edit the original message
-        await message.edit(embed=embed)
+        lines = [
+            f"- {task.get('Status')}: {task.get('Quantity', '')} {task.get('Item Needed', '')} "
+            f"to {task.get('Delivery Location', '?')} ({task.get('Assigned to') or 'unassigned'})"
+            for task in tasks
+        ]
+        embed = discord.Embed(title="Task History", description="\n".join(lines), color=discord.Color.blue())
+        embed.set_footer(text="Showing up to 20 archived tasks, oldest first.")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="loop_stats")
+    async def loop_stats(self, ctx):
+        """Show how long the event loop has been blocked since startup."""
+        stats = self.bot.loop_monitor.get_stats()
+        embed = discord.Embed(title="Event Loop Stalls", color=discord.Color.blue())
+        for key, value in stats.items():
+            embed.add_field(name=key.replace('_', ' ').title(), value=str(value), inline=True)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="startup_stats")
+    async def startup_stats(self, ctx):
+        """Show how long each cog took to load and warm up."""
+        await ctx.send(f"```\n{self.bot.startup.report()}\n```")
 
 async def setup(bot):
     await bot.add_cog(FlowManagerCog(bot))
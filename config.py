@@ -6,3 +6,50 @@ STOCKPILE_CHANNEL = 'stockpiles'
 COMMANDS_CHANNEL = 'commands'
 LOGS_CHANNEL = 'log'
 DASHBOARD_CHANNEL = 'dashboard'
+
+
+# Task persistence
+TASK_STORE_BACKEND = "sqlite"  # "sqlite", "journal" or "json"
+TASK_JSON_PATH = "data/tasks.json"  # Legacy JSON list, imported once into SQLite
+TASK_DB_PATH = "data/tasks.db"
+TASK_JOURNAL_PATH = "data/tasks_journal.jsonl"  # Append-only event log for the "journal" backend
+TASK_SNAPSHOT_PATH = "data/tasks_snapshot.json"  # Folded state the journal is replayed on top of
+TASK_COMPACT_INTERVAL = 600  # Seconds between journal compactions
+TASK_COMPACT_THRESHOLD = 5000  # Compact early once the journal holds this many records
+TASK_WRITE_BEHIND = True  # Coalesce task updates and flush them in the background
+TASK_FLUSH_DELAY = 2.0  # Seconds to wait before flushing dirty tasks
+TASK_FLUSH_THRESHOLD = 50  # Flush immediately once this many tasks are dirty
+TASK_ARCHIVE_DIR = "data/task_archive"  # Gzipped monthly JSONL files of finished tasks
+TASK_ARCHIVE_AFTER_DAYS = 14  # Finished tasks older than this leave the hot store
+TASK_ARCHIVE_INTERVAL = 3600  # Seconds between archive passes
+
+# Player persistence
+PLAYER_DATA_PATH = "data/player_data.json"
+PLAYER_FLUSH_DELAY = 5.0  # Seconds to batch player changes before writing them
+
+# Flow data
+FLOW_DATA_PATH = "data/flow_data.json"
+INVENTORY_DB_PATH = "data/inventory.db"  # Stockpile contents, kept apart from the flow graph
+ANCHORS_PATH = "data/anchors.json"  # Where each dashboard/overview message lives, per guild
+
+# Data file encoding
+JSON_BACKEND = "auto"  # "auto" (fastest installed), "orjson", "msgspec" or "stdlib"
+PRETTY_JSON = False  # Indent data files for humans; compact files are smaller and faster
+
+# Task board
+MASS_ORDER_AGGREGATE = True  # Post one message per mass-order line with a slice claim menu, instead of one per slice
+POST_CONCURRENCY = 5  # Sends in flight per channel; Discord allows 5 messages per 5 s per channel
+POST_MAX_RETRIES = 5  # Retries for a post that hit a 429 or a server error
+POST_RETRY_BASE = 1.0  # Seconds of backoff before the first retry, doubled each time
+EDIT_COALESCE_WINDOW = 1.0  # Seconds during which repeated edits to one message collapse into the last
+EDIT_TRACKED_MESSAGES = 1000  # Messages whose last render is remembered to skip no-op edits
+MESSAGE_HANDLE_CACHE_SIZE = 2000  # PartialMessage handles kept for edits without fetch_message
+DASHBOARD_DEBOUNCE = 5.0  # Seconds to batch data changes before re-rendering a dashboard message
+TASK_EMBED_CACHE_SIZE = 2000  # Rendered task/order embeds kept, keyed by the task versions they show
+
+# Gateway and member cache
+LOW_FOOTPRINT_MEMBERS = False  # Don't download and cache every member at startup; look members up on demand
+MEMBER_CHUNK_GUILD_IDS = []  # Guilds still fully cached in low-footprint mode (e.g. a small staff server)
+MEMBER_LOOKUP_CACHE_SIZE = 500  # Members kept by bot.members for on-demand lookups (LRU)
+MEMBER_LOOKUP_TTL = 300  # Seconds a looked-up member, and its roles, is trusted before fetching again
+MEMBER_RESYNC_INTERVAL = 3600  # Low-footprint mode: seconds between member re-syncs, since nickname/role changes of uncached members raise no event
@@ -5,6 +5,23 @@ from dotenv import load_dotenv
 import discord
 import asyncio
 
+import config
+from utils.anchors import AnchorRegistry
+from utils.edit_coalescer import EditCoalescer
+from utils.flow_data import FlowData
+from utils.inventory_store import InventoryStore
+from utils.loop_monitor import LoopStallMonitor
+from utils.member_lookup import MemberLookup
+from utils.message_handles import MessageHandles
+from utils.player_repository import PlayerRepository
+from utils.post_scheduler import PostScheduler
+from utils.reaction_routes import ReactionRoutes
+from utils.startup import StartupOrchestrator
+from utils.storage import AsyncStorage
+from utils.task_archive import TaskArchiver
+from utils.task_manager import TaskManager
+from utils.write_coordinator import WriteCoordinator
+
 # Load environment variables
 load_dotenv()
 
@@ -19,11 +36,31 @@ intents.members = True
 intents.guilds = True
 intents.message_content = True
 
+class Bot(commands.Bot):
+    async def close(self):
+        # Queued posts and edits need the HTTP session, which super().close() shuts
+        await self.poster.close()
+        await self.editor.close()
+        await super().close()
+
+
 # Create bot instance
-bot = commands.Bot(command_prefix="!", intents=intents)
+if config.LOW_FOOTPRINT_MEMBERS:
+    # Members aren't downloaded at startup or kept beyond what events carry;
+    # cogs look them up on demand through bot.members
+    bot = Bot(
+        command_prefix="!",
+        intents=intents,
+        chunk_guilds_at_startup=False,
+        member_cache_flags=discord.MemberCacheFlags.none(),
+    )
+else:
+    bot = Bot(command_prefix="!", intents=intents)
 
 # List of cogs to load
 COGS_TO_LOAD = [
+    "cogs.reaction_dispatcher",
+    "cogs.task_board",
     "cogs.tasks_generator",
     "cogs.delivery_manager",
     "cogs.delivery_point_display", 
@@ -36,19 +73,6 @@ COGS_TO_LOAD = [
 
 ]
 
-async def load_extensions():
-    """
-    Asynchronously load all extensions (cogs) for the bot.
-    """
-    for cog in COGS_TO_LOAD:
-        try:
-            await bot.load_extension(cog)
-            logging.info(f"Loaded extension: {cog} successfully")
-        except commands.ExtensionFailed as e:
-            logging.error(f"Extension {cog} failed to load. Error: {e}")
-        except Exception as e:
-            logging.error(f"Unexpected error loading extension {cog}. Error: {e}")
-
 @bot.event
 async def on_ready():
     """
@@ -65,16 +89,50 @@ async def main():
         logging.error("DISCORD_BOT_TOKEN is not set in environment variables.")
         return
 
-    # Load extensions
-    await load_extensions()
+    # Shared services must exist before any cog is loaded
+    bot.loop_monitor = LoopStallMonitor()
+    bot.loop_monitor.start()
+    bot.startup = StartupOrchestrator(bot)
+    bot.add_listener(bot.startup.on_ready)
+    bot.writer = WriteCoordinator()
+    bot.storage = AsyncStorage(bot.writer)
+    bot.poster = PostScheduler()
+    bot.editor = EditCoalescer()
+    bot.message_handles = MessageHandles(bot)
+    bot.reaction_routes = ReactionRoutes()
+    bot.members = MemberLookup()
+    bot.anchors = AnchorRegistry(writer=bot.writer)
+    bot.add_listener(bot.anchors.on_raw_message_delete)
+    bot.task_manager = TaskManager(writer=bot.writer)
+    bot.task_manager.add_listener(lambda task, event: bot.dispatch("task_update", task, event))
+    bot.task_archiver = TaskArchiver(bot.task_manager)
+    bot.task_archiver.start()
+    bot.players = PlayerRepository(writer=bot.writer)
+    bot.players.add_listener(lambda player_id, player: bot.dispatch("player_update", player_id, player))
+    bot.flow_data = FlowData(storage=bot.storage)
+    bot.flow_data.add_listener(lambda: bot.dispatch("flow_data_update"))
+    bot.inventory = InventoryStore()
+    bot.inventory.migrate_from_flow_data(bot.flow_data)
 
-    # Start the bot
     try:
-        await bot.start(DISCORD_BOT_TOKEN)
-    except discord.LoginFailure as e:
-        logging.error(f"Failed to log in: {e}")
-    except Exception as e:
-        logging.error(f"Unexpected error occurred while starting the bot: {e}")
+        async with bot:
+            # Load extensions; their warmups run once the bot is first ready
+            await bot.startup.load_extensions(COGS_TO_LOAD)
+
+            # Start the bot
+            try:
+                await bot.start(DISCORD_BOT_TOKEN)
+            except discord.LoginFailure as e:
+                logging.error(f"Failed to log in: {e}")
+            except Exception as e:
+                logging.error(f"Unexpected error occurred while starting the bot: {e}")
+    finally:
+        # Posts and edits were drained by bot.close(); persist any pending task and player changes
+        bot.task_archiver.stop()
+        bot.task_manager.close()
+        bot.players.close()
+        bot.inventory.close()
+        await bot.writer.drain()
 
 # Run the bot
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+# anchors.py
+
+import logging
+from pathlib import Path
+
+import discord
+
+import config
+from utils import serializers
+from utils.write_coordinator import dump_json, write_atomic
+
+logger = logging.getLogger('discord.anchors')
+
+
+class AnchorRegistry:
+    """Persisted (guild, purpose) -> (channel, message) map of the bot's own long-lived messages (bot.anchors).
+
+    Cogs look their dashboard/overview messages up here at startup instead of
+    scanning channel history; the scan remains as a fallback for messages
+    posted before the registry existed. Stored in data/anchors.json.
+    """
+
+    def __init__(self, path=config.ANCHORS_PATH, writer=None):
+        self.path = Path(path)
+        self.writer = writer  # WriteCoordinator; writes are synchronous without one
+        self.anchors = {}  # "guild_id:purpose" -> {"channel_id": ..., "message_id": ...}
+        self.load()
+
+    def load(self):
+        try:
+            self.anchors = serializers.read_file(self.path)
+        except FileNotFoundError:
+            self.anchors = {}
+        except serializers.DecodeError as e:
+            logger.error(f"Could not parse {self.path}, starting with no anchors: {e}")
+            self.anchors = {}
+
+    def save(self):
+        if self.writer is not None:
+            self.writer.submit(self.path, self.anchors)
+        else:
+            write_atomic(self.path, dump_json(self.anchors))
+
+    @staticmethod
+    def _key(guild_id, purpose):
+        return f"{guild_id}:{purpose}"
+
+    def get(self, guild_id, purpose):
+        """Return (channel_id, message_id) for an anchor, or None."""
+        entry = self.anchors.get(self._key(guild_id, purpose))
+        return (entry["channel_id"], entry["message_id"]) if entry else None
+
+    def set(self, channel, purpose, message_id, content_hash=None):
+        """Record the message serving a purpose in the channel's guild.
+
+        content_hash optionally records what the message shows, so a later
+        render can be compared without fetching or re-sending it.
+        """
+        key = self._key(channel.guild.id, purpose)
+        entry = {"channel_id": channel.id, "message_id": message_id}
+        if content_hash is not None:
+            entry["hash"] = content_hash
+        if self.anchors.get(key) != entry:
+            self.anchors[key] = entry
+            self.save()
+
+    def find(self, guild_id, prefix):
+        """Return {purpose: entry} for a guild's anchors whose purpose starts with prefix.
+
+        Entries are dicts with channel_id, message_id and, if recorded, hash.
+        """
+        key_prefix = self._key(guild_id, prefix)
+        return {key.split(":", 1)[1]: dict(entry) for key, entry in self.anchors.items() if key.startswith(key_prefix)}
+
+    def remove(self, guild_id, purpose):
+        if self.anchors.pop(self._key(guild_id, purpose), None) is not None:
+            self.save()
+
+    def discard_message(self, message_id):
+        """Forget every anchor pointing at a message, e.g. because it was deleted."""
+        stale = [key for key, entry in self.anchors.items() if entry["message_id"] == message_id]
+        for key in stale:
+            del self.anchors[key]
+        if stale:
+            self.save()
+
+    async def on_raw_message_delete(self, payload):
+        """Listener (registered in main.py) dropping anchors whose message was deleted."""
+        self.discard_message(payload.message_id)
+
+    async def resolve(self, channel, purpose, match, limit=50):
+        """Return the ID of the bot's message for purpose in channel, or None if it must be posted.
+
+        A registered message is confirmed with a single fetch, since it may
+        have been deleted while the bot was offline; a deleted one is dropped.
+        Otherwise the last `limit` messages are scanned for one of the bot's own
+        that satisfies match(message), and a hit is recorded so the next
+        startup skips the scan.
+        """
+        entry = self.get(channel.guild.id, purpose)
+        if entry is not None and entry[0] == channel.id:
+            try:
+                await channel.get_partial_message(entry[1]).fetch()
+                return entry[1]
+            except discord.NotFound:
+                logger.info(f"Anchor {purpose} in #{channel} was deleted, looking for a replacement")
+                self.remove(channel.guild.id, purpose)
+            except discord.HTTPException as e:
+                # Can't tell whether it still exists; keep it rather than post a duplicate
+                logger.warning(f"Could not check anchor {purpose} in #{channel}: {e}")
+                return entry[1]
+
+        me = channel.guild.me
+        async for message in channel.history(limit=limit):
+            if message.author == me and match(message):
+                self.set(channel, purpose, message.id)
+                return message.id
+        return None
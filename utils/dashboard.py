@@ -0,0 +1,102 @@
+# dashboard.py
+
+import asyncio
+import logging
+
+import config
+from utils.edit_coalescer import fingerprint
+
+logger = logging.getLogger('discord.dashboard')
+
+
+class Dashboard:
+    """A persistent message that is re-rendered when its data changes.
+
+    render() is an async callable returning the message kwargs (embed=..., view=...).
+    Updates are requested on data-change events and debounced. An update is
+    skipped without rendering when the source version hasn't moved, and
+    without editing when the rendered payload hashes the same as the last one.
+    """
+
+    def __init__(self, bot, name, render, version=None, debounce=config.DASHBOARD_DEBOUNCE):
+        self.bot = bot
+        self.name = name  # Also the purpose its message is recorded under in bot.anchors
+        self.render = render
+        self.version = version  # Optional callable returning the source data version
+        self.debounce = debounce
+        self.channel_id = None
+        self.message_id = None
+        self.fingerprint = None  # Hash of the payload the message currently shows
+        self._rendered_version = None
+        self._handle = None
+        self._task = None
+        self._lock = asyncio.Lock()
+        self.stats = {"renders": 0, "edits": 0, "skipped": 0}
+
+    def attach(self, channel_id, message_id=None):
+        """Point the dashboard at a channel and, if it already exists, its message."""
+        if (channel_id, message_id) != (self.channel_id, self.message_id):
+            self.fingerprint = None
+            self._rendered_version = None
+        self.channel_id = channel_id
+        self.message_id = message_id
+
+    def request_update(self):
+        """Update after the debounce delay; requests within it collapse into one update."""
+        if self._handle is not None or self.channel_id is None:
+            return
+        self._handle = asyncio.get_running_loop().call_later(self.debounce, self._start_update)
+
+    def _start_update(self):
+        self._handle = None
+        self._task = asyncio.ensure_future(self.update())
+
+    async def update(self, force=False):
+        """Render and edit the message if its content changed. Returns True if Discord was called."""
+        async with self._lock:
+            if self.channel_id is None:
+                return False
+            version = self.version() if self.version else None
+            if not force and self.message_id is not None and version is not None and version == self._rendered_version:
+                self.stats["skipped"] += 1
+                return False
+
+            kwargs = await self.render()
+            self.stats["renders"] += 1
+            self._rendered_version = version
+            rendered = fingerprint(**kwargs)
+            if not force and self.message_id is not None and rendered == self.fingerprint:
+                self.stats["skipped"] += 1
+                return False
+
+            if self.message_id is not None:
+                message = self.bot.message_handles.get(self.channel_id, self.message_id)
+                try:
+                    await self.bot.editor.edit(message, **kwargs)
+                except Exception as e:
+                    if getattr(e, "status", None) != 404:
+                        self.fingerprint = None
+                        logger.error(f"Failed to update the {self.name} dashboard: {e}")
+                        return False
+                    # The message was deleted; post a new one below
+                    self.bot.message_handles.discard(self.message_id)
+                    self.message_id = None
+
+            if self.message_id is None:
+                channel = self.bot.get_channel(self.channel_id)
+                if channel is None:
+                    logger.error(f"Channel {self.channel_id} for the {self.name} dashboard not found")
+                    return False
+                message = await channel.send(**kwargs)
+                self.message_id = message.id
+                self.bot.editor.remember(message.id, **kwargs)
+                self.bot.anchors.set(channel, self.name, message.id)
+
+            self.fingerprint = rendered
+            self.stats["edits"] += 1
+            return True
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
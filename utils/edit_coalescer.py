@@ -0,0 +1,167 @@
+# edit_coalescer.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+
+import config
+
+logger = logging.getLogger('discord.edit_coalescer')
+
+
+def fingerprint(**kwargs):
+    """Hash the rendered form of message.edit/send kwargs (embeds, views, content)."""
+    def render(value):
+        if hasattr(value, "to_dict"):  # discord.Embed
+            return value.to_dict()
+        if hasattr(value, "to_components"):  # discord.ui.View
+            return value.to_components()
+        if isinstance(value, (list, tuple)):
+            return [render(item) for item in value]
+        return value
+
+    rendered = {key: render(value) for key, value in kwargs.items()}
+    encoded = json.dumps(rendered, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+class _MessageState:
+    __slots__ = ("fingerprint", "last_edit", "pending", "waiters", "timer", "lock")
+
+    def __init__(self):
+        self.fingerprint = None  # Of the content Discord currently shows, if known
+        self.last_edit = 0.0
+        self.pending = None  # (message, kwargs, fingerprint) waiting for the window to close
+        self.waiters = []
+        self.timer = None
+        self.lock = asyncio.Lock()
+
+
+class EditCoalescer:
+    """Collapses bursts of edits to the same message (bot.editor).
+
+    The first edit to a quiet message goes out straight away. Further edits
+    within `window` seconds replace each other, and only the last one is sent
+    when the window closes. Edits that would render exactly what the message
+    already shows are skipped.
+    """
+
+    def __init__(self, window=config.EDIT_COALESCE_WINDOW, max_tracked=config.EDIT_TRACKED_MESSAGES):
+        self.window = window
+        self.max_tracked = max_tracked  # Messages whose last render is remembered (LRU)
+        self.states = OrderedDict()  # Message ID -> _MessageState
+        self.stats = {"requested": 0, "sent": 0, "coalesced": 0, "skipped": 0}
+        self._flushes = set()  # Running flush tasks, referenced until they finish
+
+    def _state(self, message_id):
+        state = self.states.get(message_id)
+        if state is None:
+            state = self.states[message_id] = _MessageState()
+            while len(self.states) > self.max_tracked:
+                oldest_id, oldest = next(iter(self.states.items()))
+                if oldest.pending is not None or oldest.lock.locked():
+                    break  # Never forget a message with an edit on the way
+                del self.states[oldest_id]
+        else:
+            self.states.move_to_end(message_id)
+        return state
+
+    def remember(self, message_id, **kwargs):
+        """Record what a message shows after it was sent or edited outside the coalescer."""
+        state = self._state(message_id)
+        state.fingerprint = fingerprint(**kwargs)
+        state.last_edit = time.monotonic()
+
+    def forget(self, message_id):
+        self.states.pop(message_id, None)
+
+    def edit(self, message, **kwargs):
+        """Request message.edit(**kwargs). Returns a future that resolves once the edit is sent or skipped.
+
+        Callers don't have to await it; failures are logged either way.
+        """
+        self.stats["requested"] += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        state = self._state(message.id)
+        rendered = fingerprint(**kwargs)
+
+        if state.pending is not None:
+            # Replace the queued edit; everyone waiting gets the final state
+            self.stats["coalesced"] += 1
+            state.pending = (message, kwargs, rendered)
+            state.waiters.append(future)
+            return future
+        if rendered == state.fingerprint and not state.lock.locked():
+            self.stats["skipped"] += 1
+            future.set_result(None)
+            return future
+
+        state.pending = (message, kwargs, rendered)
+        state.waiters.append(future)
+        delay = max(state.last_edit + self.window - time.monotonic(), 0.0)
+        state.timer = loop.call_later(delay, self._start_flush, message.id, state)
+        return future
+
+    def _start_flush(self, message_id, state):
+        task = asyncio.ensure_future(self._flush(message_id, state))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, message_id, state):
+        async with state.lock:
+            state.timer = None
+            if state.pending is None:
+                return
+            message, kwargs, rendered = state.pending
+            waiters = state.waiters
+            state.pending = None
+            state.waiters = []
+
+            if rendered == state.fingerprint:
+                self.stats["skipped"] += 1
+                self._resolve(waiters, None)
+                return
+
+            state.last_edit = time.monotonic()
+            try:
+                result = await message.edit(**kwargs)
+            except Exception as e:
+                # The message may be gone or changed elsewhere; don't trust the old render
+                state.fingerprint = None
+                logger.warning(f"Edit of message {message_id} failed: {e}")
+                self._resolve(waiters, exception=e)
+                return
+            state.fingerprint = rendered
+            self.stats["sent"] += 1
+            self._resolve(waiters, result)
+
+    async def close(self, timeout=10):
+        """Send edits still waiting out their window now, giving them up to timeout seconds."""
+        for message_id, state in self.states.items():
+            if state.timer is not None:
+                state.timer.cancel()
+                self._start_flush(message_id, state)
+        if not self._flushes:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*self._flushes, return_exceptions=True), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {len(self._flushes)} pending edits on shutdown")
+
+    @staticmethod
+    def _resolve(waiters, result=None, exception=None):
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if exception is not None:
+                waiter.set_exception(exception)
+                waiter.exception()  # Fire-and-forget callers never retrieve it
+            else:
+                waiter.set_result(result)
+
+    def get_stats(self):
+        return dict(self.stats, tracked=len(self.states))
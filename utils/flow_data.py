@@ -0,0 +1,172 @@
+# flow_data.py
+
+import asyncio
+import logging
+import os
+
+import config
+from utils import serializers
+from utils.write_coordinator import dump_json, write_atomic
+
+logger = logging.getLogger('discord.flow_data')
+
+
+class FlowData:
+    """Shared, cached view of data/flow_data.json (bot.flow_data).
+
+    The file is only re-parsed when its mtime or size changes, and lookup
+    dicts are prebuilt on each parse so validation is a dict probe.
+    """
+
+    def __init__(self, path=config.FLOW_DATA_PATH, storage=None):
+        self.path = path
+        self.storage = storage  # AsyncStorage; without one all I/O is synchronous
+        self._data = {}
+        self._stamp = None  # (mtime_ns, size) of the file we last parsed or wrote
+        self._writes_in_flight = 0
+        self._reload_task = None
+        self.buttons_by_step = {}  # Step -> list of buttons
+        self.labels_by_step = {}  # Step -> {label: button}
+        self.buttons_by_custom_id = {}  # custom_id -> button
+        self.stockpiles = {}  # Lowercased delivery label -> delivery_selection entry
+        self.version = 0  # Bumped on every re-parse or save
+        self.listeners = []  # Callables notified with no arguments after the data changed
+        # Parse synchronously even inside the loop: startup code (e.g. the inventory migration) reads it right away
+        self.refresh(force=True)
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self, force=False):
+        """Re-parse the file if it changed on disk (or always, with force=True).
+
+        Inside the event loop the re-parse is started in the background and the
+        current data keeps being served until it finishes.
+        """
+        if not force and self._writes_in_flight:
+            # Our own save is still being committed; memory is already newer than disk
+            return False
+        stamp = self._file_stamp()
+        if not force and stamp == self._stamp:
+            return False
+        if not force and self.storage is not None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                if self._reload_task is None or self._reload_task.done():
+                    self._reload_task = loop.create_task(self.reload())
+                return False
+        try:
+            self._data = serializers.read_file(self.path)
+        except (FileNotFoundError, *serializers.DecodeError) as e:
+            logger.error(f"Error loading flow data: {e}")
+            self._data = {}
+        self._stamp = stamp
+        self.rebuild_indexes()
+        logger.info("Flow data loaded successfully.")
+        return True
+
+    async def reload(self):
+        """Re-parse the file off the event loop."""
+        if self.storage is None:
+            self.refresh(force=True)
+            return
+        stamp = self._file_stamp()
+        version = self.version
+        data = await self.storage.load_json(self.path, default=None)
+        if self._writes_in_flight or self.version != version:
+            # A save (or another reload) happened meanwhile; what we read is older than memory
+            return
+        if data is None:
+            logger.error(f"Error loading flow data from {self.path}")
+            data = {}
+        self._data = data
+        self._stamp = stamp
+        self.rebuild_indexes()
+        logger.info("Flow data loaded successfully.")
+
+    def rebuild_indexes(self):
+        """Rebuild the lookup dicts from the current data."""
+        self.buttons_by_step = {}
+        self.labels_by_step = {}
+        self.buttons_by_custom_id = {}
+        for step_name, step_data in self._data.items():
+            buttons = step_data.get("buttons", []) if isinstance(step_data, dict) else []
+            self.buttons_by_step[step_name] = buttons
+            self.labels_by_step[step_name] = {btn["label"]: btn for btn in buttons}
+            for btn in buttons:
+                self.buttons_by_custom_id[btn["custom_id"]] = btn
+        self.stockpiles = {btn["label"].lower(): btn for btn in self.buttons_by_step.get("delivery_selection", [])}
+        self.version += 1
+        for listener in self.listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Flow data listener {listener} failed: {e}")
+
+    def add_listener(self, listener):
+        """Register a callable to be notified (with no arguments) whenever the flow data changes."""
+        self.listeners.append(listener)
+
+    def save(self):
+        """Write the current data back to disk and refresh the indexes.
+
+        With a writer the commit happens off the event loop; the returned
+        future resolves once the file is on disk.
+        """
+        self.rebuild_indexes()
+        if self.storage is None:
+            write_atomic(self.path, dump_json(self._data))
+            self._stamp = self._file_stamp()
+            logger.info("Flow data saved successfully.")
+            return None
+
+        self._writes_in_flight += 1
+        future = self.storage.save_json(self.path, self._data)
+        future.add_done_callback(self._on_saved)
+        return future
+
+    def _on_saved(self, future):
+        self._writes_in_flight -= 1
+        if not future.cancelled() and future.exception() is None:
+            self._stamp = self._file_stamp()
+            logger.info("Flow data saved successfully.")
+
+    @property
+    def data(self):
+        """The raw flow data dict. Call save() after mutating it."""
+        self.refresh()
+        return self._data
+
+    def step(self, step_name):
+        """Return the raw data for a step, or None."""
+        return self.data.get(step_name)
+
+    def buttons(self, step_name):
+        """Return the list of buttons for a step."""
+        self.refresh()
+        return self.buttons_by_step.get(step_name, [])
+
+    def labels(self, step_name):
+        """Return {label: button} for a step; use it for O(1) membership checks."""
+        self.refresh()
+        return self.labels_by_step.get(step_name, {})
+
+    def button(self, step_name, label):
+        """Return the button with this label in a step, or None."""
+        return self.labels(step_name).get(label)
+
+    def button_by_custom_id(self, custom_id):
+        self.refresh()
+        return self.buttons_by_custom_id.get(custom_id)
+
+    def stockpile(self, label):
+        """Return the delivery_selection entry for a stockpile label (case-insensitive), or None."""
+        self.refresh()
+        return self.stockpiles.get(label.lower())
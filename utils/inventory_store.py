@@ -0,0 +1,173 @@
+# inventory_store.py
+
+import asyncio
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import config
+
+logger = logging.getLogger('discord.inventory_store')
+
+# Stockpile categories; these used to be lists inside each flow_data delivery entry
+CATEGORIES = [
+    "small_arms", "heavy_arms", "heavy_ammunition",
+    "utility", "medical", "resource",
+    "uniform", "vehicle", "shippable_structure"
+]
+
+
+class InventoryStore:
+    """Stockpile contents keyed by (stockpile, category, item), kept apart from the flow graph.
+
+    Reads come from an in-memory dict; every change writes just the affected
+    row to SQLite, committed on a dedicated thread so the event loop never waits.
+    """
+
+    def __init__(self, path=config.INVENTORY_DB_PATH):
+        self.path = Path(path)
+        # Shared with the write thread; sqlite3 serializes access to the connection
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inventory-store")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS inventory (
+                    stockpile TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    item TEXT NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    PRIMARY KEY (stockpile, category, item)
+                )
+                """
+            )
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        # (stockpile, category) -> {lowercased item name: [item name, quantity]}
+        self.contents = {}
+        self.load()
+
+    def load(self):
+        self.contents = {}
+        rows = self.conn.execute("SELECT stockpile, category, item, quantity FROM inventory ORDER BY rowid")
+        for stockpile, category, item, quantity in rows:
+            self.contents.setdefault((stockpile, category), {})[item.lower()] = [item, quantity]
+
+    def _write_row(self, stockpile, category, item, quantity):
+        """Persist a single row (on the write thread inside the event loop); a quantity of 0 deletes it."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._commit_row(stockpile, category, item, quantity)
+            return
+        # One worker thread keeps commits in order
+        future = loop.run_in_executor(self._executor, self._commit_row, stockpile, category, item, quantity)
+        future.add_done_callback(self._on_written)
+
+    def _commit_row(self, stockpile, category, item, quantity):
+        with self.conn:
+            if quantity > 0:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO inventory VALUES (?, ?, ?, ?)",
+                    (stockpile, category, item, quantity),
+                )
+            else:
+                self.conn.execute(
+                    "DELETE FROM inventory WHERE stockpile = ? AND category = ? AND item = ?",
+                    (stockpile, category, item),
+                )
+
+    def items(self, stockpile, category):
+        """Return [(item, quantity), ...] for one category of a stockpile."""
+        return [tuple(entry) for entry in self.contents.get((stockpile, category), {}).values()]
+
+    def stockpile_contents(self, stockpile):
+        """Return {category: [(item, quantity), ...]} for all non-empty categories, in CATEGORIES order."""
+        contents = {}
+        for category in CATEGORIES:
+            items = self.items(stockpile, category)
+            if items:
+                contents[category] = items
+        return contents
+
+    def find_item(self, stockpile, category, item):
+        """Return the stored spelling of an item (case-insensitive match), or None."""
+        entry = self.contents.get((stockpile, category), {}).get(item.lower())
+        return entry[0] if entry else None
+
+    def get_quantity(self, stockpile, category, item):
+        entry = self.contents.get((stockpile, category), {}).get(item.lower())
+        return entry[1] if entry else 0
+
+    def add(self, stockpile, category, item, quantity):
+        """Add quantity of an item and return the new total."""
+        items = self.contents.setdefault((stockpile, category), {})
+        entry = items.get(item.lower())
+        if entry is None:
+            entry = items[item.lower()] = [item, 0]
+        entry[1] += quantity
+        self._write_row(stockpile, category, entry[0], entry[1])
+        return entry[1]
+
+    def remove(self, stockpile, category, item, quantity):
+        """Remove up to quantity of an item and return what remains (0 means the row is gone)."""
+        items = self.contents.get((stockpile, category), {})
+        entry = items.get(item.lower())
+        if entry is None:
+            return 0
+        entry[1] = max(entry[1] - quantity, 0)
+        self._write_row(stockpile, category, entry[0], entry[1])
+        if entry[1] == 0:
+            del items[item.lower()]
+        return entry[1]
+
+    def migrate_from_flow_data(self, flow_data):
+        """Move per-category lists out of flow_data's delivery entries into this store.
+
+        Safe to run on every start: the rows and a migration marker are committed
+        in one transaction, so lists still in flow_data after the marker is set
+        (its save hadn't landed) are dropped instead of counted twice.
+        """
+        done = self.conn.execute("SELECT 1 FROM meta WHERE key = 'flow_data_migrated'").fetchone() is not None
+        migrated = 0
+        stripped = False
+        touched = set()
+        for entry in flow_data.buttons("delivery_selection"):
+            for category in CATEGORIES:
+                if category not in entry:
+                    continue
+                stripped = True
+                lists = entry.pop(category) or []
+                if done:
+                    continue
+                items = self.contents.setdefault((entry["label"], category), {})
+                for itm in lists:
+                    stored = items.setdefault(itm["name"].lower(), [itm["name"], 0])
+                    stored[1] += itm["quantity"]
+                    touched.add((entry["label"], category, stored[0].lower()))
+                    migrated += 1
+        if stripped and not done:
+            with self.conn:
+                for stockpile, category, key in touched:
+                    item, quantity = self.contents[(stockpile, category)][key]
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO inventory VALUES (?, ?, ?, ?)",
+                        (stockpile, category, item, quantity),
+                    )
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('flow_data_migrated', '1')")
+        if stripped:
+            flow_data.save()
+        if migrated:
+            logger.info(f"Migrated {migrated} stockpile items from flow data into {self.path}")
+        return migrated
+
+    @staticmethod
+    def _on_written(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Failed to write inventory to SQLite: {future.exception()}")
+
+    def close(self):
+        self._executor.shutdown(wait=True)  # Let queued commits finish
+        self.conn.close()
@@ -0,0 +1,59 @@
+# loop_monitor.py
+
+import asyncio
+import logging
+
+logger = logging.getLogger('discord.loop_monitor')
+
+
+class LoopStallMonitor:
+    """Measures how long the event loop is blocked (bot.loop_monitor).
+
+    A probe sleeps for `interval` seconds; any extra time before it wakes up
+    is time the loop spent stalled on something else (e.g. blocking file I/O).
+    """
+
+    def __init__(self, interval=0.1, threshold=0.05):
+        self.interval = interval
+        self.threshold = threshold  # Stalls longer than this (seconds) are counted and logged
+        self.samples = 0
+        self.stalls = 0
+        self.total_stall = 0.0
+        self.max_stall = 0.0
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reset(self):
+        self.samples = 0
+        self.stalls = 0
+        self.total_stall = 0.0
+        self.max_stall = 0.0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            stall = max(loop.time() - start - self.interval, 0.0)
+            self.samples += 1
+            self.total_stall += stall
+            self.max_stall = max(self.max_stall, stall)
+            if stall > self.threshold:
+                self.stalls += 1
+                logger.warning(f"Event loop stalled for {stall * 1000:.1f} ms")
+
+    def get_stats(self):
+        return {
+            "samples": self.samples,
+            "stalls_over_threshold": self.stalls,
+            "total_stall_ms": round(self.total_stall * 1000, 1),
+            "max_stall_ms": round(self.max_stall * 1000, 1),
+        }
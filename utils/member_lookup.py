@@ -0,0 +1,131 @@
+# member_lookup.py
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+
+import discord
+from discord.ext import commands
+
+import config
+
+logger = logging.getLogger('discord.member_lookup')
+
+QUERY_BATCH_SIZE = 100  # Most user IDs Discord accepts in one member request
+
+
+class MemberLookup:
+    """Finds guild members whether or not the gateway member cache holds them (bot.members).
+
+    With config.LOW_FOOTPRINT_MEMBERS the bot doesn't download every member at
+    startup, so guild.get_member mostly misses. Members are then fetched on
+    demand and the most recently used ones kept in a small LRU, each trusted
+    for `ttl` seconds. With the full cache enabled every lookup is a cache hit.
+    """
+
+    def __init__(self, max_size=config.MEMBER_LOOKUP_CACHE_SIZE, ttl=config.MEMBER_LOOKUP_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.members = OrderedDict()  # (guild ID, member ID) -> (Member, monotonic time fetched)
+        self.stats = {"gateway_cache": 0, "hits": 0, "fetched": 0, "not_found": 0}
+
+    def get(self, guild, member_id):
+        """Return the member if known without an API call, else None."""
+        member = guild.get_member(member_id)
+        if member is not None:
+            self.stats["gateway_cache"] += 1
+            return member
+
+        entry = self.members.get((guild.id, member_id))
+        if entry is None:
+            return None
+        member, fetched_at = entry
+        if time.monotonic() - fetched_at > self.ttl:
+            del self.members[(guild.id, member_id)]
+            return None
+        self.members.move_to_end((guild.id, member_id))
+        self.stats["hits"] += 1
+        return member
+
+    def put(self, member):
+        """Remember a member, e.g. one received in an event payload."""
+        key = (member.guild.id, member.id)
+        self.members[key] = (member, time.monotonic())
+        self.members.move_to_end(key)
+        while len(self.members) > self.max_size:
+            self.members.popitem(last=False)
+
+    def discard(self, guild_id, member_id):
+        """Forget a member whose roles or nickname are known to have changed."""
+        self.members.pop((guild_id, member_id), None)
+
+    async def fetch(self, guild, member_id):
+        """Return the member, fetching it over REST if needed. None if they're not in the guild."""
+        member = self.get(guild, member_id)
+        if member is not None:
+            return member
+        try:
+            member = await guild.fetch_member(member_id)
+        except discord.NotFound:
+            self.stats["not_found"] += 1
+            return None
+        self.stats["fetched"] += 1
+        self.put(member)
+        return member
+
+    async def fetch_many(self, guild, member_ids):
+        """Return {member ID: Member} for the given IDs that are in the guild.
+
+        Misses are requested over the gateway, up to 100 IDs per request,
+        rather than one REST call each.
+        """
+        found = {}
+        missing = []
+        for member_id in member_ids:
+            member = self.get(guild, member_id)
+            if member is not None:
+                found[member_id] = member
+            else:
+                missing.append(member_id)
+
+        for start in range(0, len(missing), QUERY_BATCH_SIZE):
+            batch = missing[start:start + QUERY_BATCH_SIZE]
+            try:
+                members = await guild.query_members(user_ids=batch, limit=len(batch), cache=False)
+            except asyncio.TimeoutError:
+                logger.warning(f"Member request for {len(batch)} IDs in {guild} timed out")
+                continue
+            for member in members:
+                found[member.id] = member
+                self.put(member)
+            self.stats["fetched"] += len(members)
+            self.stats["not_found"] += len(batch) - len(members)
+        return found
+
+    def get_stats(self):
+        return dict(self.stats, cached=len(self.members))
+
+
+class LookupMember(commands.Converter):
+    """Command argument converter resolving members through bot.members.
+
+    Mentions and IDs never trigger a member request when the member is
+    mentioned in the message or already known; names fall back to
+    discord.py's MemberConverter.
+    """
+
+    ID_PATTERN = re.compile(r'<@!?([0-9]{15,20})>$|([0-9]{15,20})$')
+
+    async def convert(self, ctx, argument):
+        match = self.ID_PATTERN.match(argument)
+        if match and ctx.guild is not None:
+            member_id = int(match.group(1) or match.group(2))
+            member = discord.utils.get(ctx.message.mentions, id=member_id)
+            if isinstance(member, discord.Member):
+                return member
+            member = await ctx.bot.members.fetch(ctx.guild, member_id)
+            if member is not None:
+                return member
+        return await commands.MemberConverter().convert(ctx, argument)
@@ -0,0 +1,45 @@
+# message_handles.py
+
+from collections import OrderedDict
+
+import config
+
+
+class MessageHandles:
+    """Cache of editable message handles (bot.message_handles).
+
+    Editing, reacting to or deleting a message only needs its channel ID and
+    message ID, so a discord.PartialMessage does the job without the
+    fetch_message round-trip. Fetch only when the message content is needed.
+    """
+
+    def __init__(self, bot, max_size=config.MESSAGE_HANDLE_CACHE_SIZE):
+        self.bot = bot
+        self.max_size = max_size
+        self.handles = OrderedDict()  # Message ID -> PartialMessage
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, channel_id, message_id):
+        """Return a PartialMessage for the given channel and message, without any API call."""
+        handle = self.handles.get(message_id)
+        if handle is not None and handle.channel.id == channel_id:
+            self.handles.move_to_end(message_id)
+            self.stats["hits"] += 1
+            return handle
+
+        self.stats["misses"] += 1
+        # Use the cached channel when there is one; a partial messageable is enough otherwise
+        channel = self.bot.get_channel(channel_id) or self.bot.get_partial_messageable(channel_id)
+        handle = channel.get_partial_message(message_id)
+        self.handles[message_id] = handle
+        if len(self.handles) > self.max_size:
+            self.handles.popitem(last=False)
+        return handle
+
+    def discard(self, message_id):
+        """Drop a handle, e.g. after the message turned out to be deleted."""
+        self.handles.pop(message_id, None)
+
+    async def fetch(self, channel_id, message_id):
+        """Fetch the full message, for callers that need its content."""
+        return await self.get(channel_id, message_id).fetch()
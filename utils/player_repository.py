@@ -0,0 +1,272 @@
+# player_repository.py
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+import config
+from utils import serializers
+from utils.write_coordinator import dump_json, write_atomic
+
+logger = logging.getLogger('discord.player_repository')
+
+
+def new_player(server_nickname, rank="Helots"):
+    """Return the default record for a player that is not in the database yet."""
+    return {
+        "server_nickname": server_nickname,
+        "rank": rank,
+        "war_points": 0,
+        "deployments": [],
+        "specialties": [],
+        "achievements": [],
+        "tasks_completed": 0,
+        "resources_contributed": 0,
+        "medals": [],
+        "notes": "",
+        "active": True  # False once they have left every server the bot is in
+    }
+
+
+class PlayerRepository:
+    """In-memory owner of data/player_data.json shared by every cog (bot.players).
+
+    Changes go through the typed accessors below, which mark the file dirty;
+    dirty data is written in one batch after flush_delay seconds.
+    """
+
+    def __init__(self, path=config.PLAYER_DATA_PATH, flush_delay=config.PLAYER_FLUSH_DELAY, writer=None):
+        self.path = Path(path)
+        self.writer = writer  # WriteCoordinator; saves are synchronous without one
+        self.flush_delay = flush_delay
+        self.players = {}  # Player ID (str) -> player record
+        self.dirty = set()  # Player IDs changed since the last flush
+        self.writing = set()  # Player IDs whose write is still in flight; they count as dirty
+        self.version = 0  # Bumped on every change, lets snapshot() reuse its last result
+        self.listeners = []  # Callables notified as listener(player_id, player); (None, None) after bulk changes
+        self._snapshot = None
+        self._snapshot_version = -1
+        self._flush_handle = None
+        self.stats = {"flushes": 0, "last_flush_ms": 0.0}
+        self.load()
+
+    def load(self):
+        """Load player data from JSON or start empty if it doesn't exist."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self.players = serializers.read_file(self.path).get("players", {})
+        except FileNotFoundError:
+            self.players = {}
+        except serializers.DecodeError as e:
+            logger.error(f"Could not parse {self.path}, starting with no players: {e}")
+            self.players = {}
+        self._changed()
+
+    def save(self):
+        """Write all players to disk. With a writer this happens off the event loop and a future is returned."""
+        if self.writer is not None:
+            return self.writer.submit(self.path, {"players": self.players})
+        write_atomic(self.path, dump_json({"players": self.players}))
+        return None
+
+    def flush(self):
+        """Write pending changes to disk in one pass.
+
+        Players stay dirty until the writer's future resolves and are marked
+        dirty again if the write fails.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self.dirty:
+            return
+        player_ids = set(self.dirty)
+        start = time.perf_counter()
+        try:
+            written = self.save()
+        except OSError as e:
+            logger.error(f"Failed to save player data: {e}")
+            return
+        self.dirty.clear()
+        if not asyncio.isfuture(written):
+            self._record_flush(start)
+            return
+        self.writing |= player_ids
+        written.add_done_callback(lambda future: self._on_written(future, player_ids, start))
+
+    def _on_written(self, future, player_ids, start):
+        """Account for a write that ran off the event loop; failed changes are retried."""
+        self.writing -= player_ids
+        error = asyncio.CancelledError() if future.cancelled() else future.exception()
+        if error is not None:
+            logger.error(f"Failed to save player data, will retry: {error!r}")
+            self.dirty |= player_ids
+            self._schedule_flush()
+            return
+        self._record_flush(start)
+
+    def _record_flush(self, start):
+        self.stats["flushes"] += 1
+        self.stats["last_flush_ms"] = (time.perf_counter() - start) * 1000
+
+    def close(self):
+        self.flush()
+
+    def _changed(self, player_id=None):
+        """Record a change, notify listeners and schedule a flush."""
+        self.version += 1
+        if player_id is None:
+            return
+        self.dirty.add(player_id)
+        self._notify(player_id, self.players.get(player_id))
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Flush after flush_delay unless one is already pending."""
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._flush_handle = loop.call_later(self.flush_delay, self.flush)
+
+    def _notify(self, player_id, player):
+        for listener in self.listeners:
+            try:
+                listener(player_id, player)
+            except Exception as e:
+                logger.error(f"Player listener {listener} failed for player {player_id}: {e}")
+
+    def add_listener(self, listener):
+        """Register a callable to be notified as listener(player_id, player) on every change.
+
+        Bulk changes such as reconcile() notify once with (None, None).
+        """
+        self.listeners.append(listener)
+
+    # Reads
+
+    def get(self, player_id):
+        """Return a player's record, or None. Don't mutate it; use the accessors below."""
+        return self.players.get(str(player_id))
+
+    def __contains__(self, player_id):
+        return str(player_id) in self.players
+
+    def snapshot(self):
+        """Return a read-only view of all players for loops that only read.
+
+        The view is rebuilt only after something changed, so polling loops reuse it.
+        """
+        if self._snapshot_version != self.version:
+            self._snapshot = MappingProxyType(
+                {player_id: MappingProxyType(dict(data)) for player_id, data in self.players.items()}
+            )
+            self._snapshot_version = self.version
+        return self._snapshot
+
+    # Writes
+
+    def add_player(self, player_id, server_nickname, rank="Helots"):
+        """Add a player if missing. Returns True if a new record was created."""
+        player_id = str(player_id)
+        if player_id in self.players:
+            return False
+        self.players[player_id] = new_player(server_nickname, rank)
+        self._changed(player_id)
+        return True
+
+    def ensure_player(self, member, rank="Helots"):
+        """Return the record for a Discord member, creating it if needed."""
+        self.add_player(member.id, member.display_name, rank)
+        return self.players[str(member.id)]
+
+    def update_player(self, player_id, **fields):
+        """Set top-level fields on an existing player, e.g. update_player(id, rank="Hoplites")."""
+        player_id = str(player_id)
+        player = self.players.get(player_id)
+        if player is None:
+            return False
+        changed = {key: value for key, value in fields.items() if player.get(key) != value}
+        if not changed:
+            return False
+        player.update(changed)
+        self._changed(player_id)
+        return True
+
+    def reconcile(self, members, complete=True):
+        """Bring the players in line with the server's members in one batch and one write.
+
+        members maps player ID -> (server_nickname, rank). Missing players are
+        added and stored nicknames and ranks refreshed. With complete=True,
+        stored players not in members are marked inactive; their records are kept.
+        Returns {"added": n, "updated": n, "departed": n}.
+        """
+        counts = {"added": 0, "updated": 0, "departed": 0}
+        changed = set()
+        for player_id, (server_nickname, rank) in members.items():
+            player_id = str(player_id)
+            player = self.players.get(player_id)
+            if player is None:
+                self.players[player_id] = new_player(server_nickname, rank)
+                counts["added"] += 1
+                changed.add(player_id)
+                continue
+            stored = (player.get("server_nickname"), player.get("rank"), player.get("active", True))
+            if stored == (server_nickname, rank, True):
+                continue
+            player.update(server_nickname=server_nickname, rank=rank, active=True)
+            counts["updated"] += 1
+            changed.add(player_id)
+
+        if complete:
+            present = {str(player_id) for player_id in members}
+            for player_id, player in self.players.items():
+                if player_id not in present and player.get("active", True):
+                    player["active"] = False
+                    counts["departed"] += 1
+                    changed.add(player_id)
+
+        if changed:
+            self.version += 1
+            self.dirty.update(changed)
+            self.flush()
+            self._notify(None, None)
+        return counts
+
+    def add_war_points(self, player_id, points):
+        player_id = str(player_id)
+        if player_id not in self.players:
+            return False
+        self.players[player_id]["war_points"] += points
+        self._changed(player_id)
+        return True
+
+    def increment_tasks_completed(self, player_id, count=1):
+        player_id = str(player_id)
+        if player_id not in self.players:
+            return False
+        self.players[player_id]["tasks_completed"] += count
+        self._changed(player_id)
+        return True
+
+    def award_medal(self, player_id, medal):
+        """Give a medal and its war points to a player. Returns False if they already have it."""
+        player_id = str(player_id)
+        player = self.players.get(player_id)
+        if player is None:
+            return False
+        if any(m["name"] == medal["name"] for m in player["medals"]):
+            return False
+        player["medals"].append({
+            "name": medal["name"],
+            "war_points": medal["war_points"]
+        })
+        player["achievements"].append(medal["name"])  # Add medal to achievements
+        player["war_points"] += medal["war_points"]
+        self._changed(player_id)
+        return True
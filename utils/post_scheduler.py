@@ -0,0 +1,147 @@
+# post_scheduler.py
+
+import asyncio
+import logging
+import random
+
+import discord
+
+import config
+
+logger = logging.getLogger('discord.post_scheduler')
+
+
+class PostBatch:
+    """Progress of a group of posts submitted together (e.g. one mass order)."""
+
+    def __init__(self, total):
+        self.total = total
+        self.posted = 0
+        self.failed = 0
+        self._done = asyncio.Event()
+        if total == 0:
+            self._done.set()
+
+    @property
+    def finished(self):
+        return self.posted + self.failed
+
+    def _record(self, ok):
+        if ok:
+            self.posted += 1
+        else:
+            self.failed += 1
+        if self.finished >= self.total:
+            self._done.set()
+
+    async def wait(self, timeout=None):
+        """Wait until every post has been sent or has failed. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class PostScheduler:
+    """Queues channel posts and drains them at the rate Discord allows (bot.poster).
+
+    Each channel gets its own queue served by `concurrency` workers, so several
+    sends are in flight per channel and discord.py's per-route bucket paces them
+    instead of one await after another. Sends that fail with 429 or a 5xx are
+    retried with backoff. Within a channel, posts may land slightly out of order.
+    """
+
+    def __init__(self, concurrency=config.POST_CONCURRENCY, max_retries=config.POST_MAX_RETRIES,
+                 retry_base=config.POST_RETRY_BASE):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_base = retry_base  # Seconds; doubled on every retry unless Discord says otherwise
+        self.queues = {}  # Channel ID -> asyncio.Queue of pending posts
+        self.workers = []
+        self.stats = {"posted": 0, "failed": 0, "retries": 0}
+
+    def submit(self, channel, on_posted=None, batch=None, **kwargs):
+        """Queue channel.send(**kwargs). on_posted(message) runs once the message exists.
+
+        Returns a future resolving to the sent message, or raising the final send error.
+        """
+        future = asyncio.get_running_loop().create_future()
+        queue = self.queues.get(channel.id)
+        if queue is None:
+            queue = self.queues[channel.id] = asyncio.Queue()
+            for _ in range(self.concurrency):
+                self.workers.append(asyncio.create_task(self._worker(queue)))
+        queue.put_nowait((channel, kwargs, on_posted, batch, future))
+        return future
+
+    def submit_batch(self, channel, posts, on_posted=None):
+        """Queue several posts, given as kwargs dicts. on_posted(index, message) runs per post."""
+        batch = PostBatch(len(posts))
+        for index, kwargs in enumerate(posts):
+            callback = (lambda message, index=index: on_posted(index, message)) if on_posted else None
+            self.submit(channel, on_posted=callback, batch=batch, **kwargs)
+        return batch
+
+    async def _worker(self, queue):
+        while True:
+            channel, kwargs, on_posted, batch, future = await queue.get()
+            try:
+                message = await self._send(channel, kwargs)
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Giving up posting to #{channel}: {e}")
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()  # Callers may not await the future; don't warn about it
+                if batch is not None:
+                    batch._record(False)
+            else:
+                self.stats["posted"] += 1
+                if on_posted is not None:
+                    try:
+                        on_posted(message)
+                    except Exception as e:
+                        logger.error(f"Post callback failed for message {message.id}: {e}")
+                if not future.done():
+                    future.set_result(message)
+                if batch is not None:
+                    batch._record(True)
+            finally:
+                queue.task_done()
+
+    async def _send(self, channel, kwargs):
+        """Send with retries on rate limits and server errors."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await channel.send(**kwargs)
+            except discord.RateLimited as e:
+                # discord.py refused to wait this long itself
+                delay = e.retry_after
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    raise
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_base * 2 ** attempt
+            if attempt == self.max_retries:
+                raise discord.DiscordException(f"still rate limited after {self.max_retries} retries")
+            self.stats["retries"] += 1
+            delay += random.uniform(0, self.retry_base)  # Spread out workers that were limited together
+            logger.warning(f"Post to #{channel} limited, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def pending(self):
+        """Return how many posts are still queued, across all channels."""
+        return sum(queue.qsize() for queue in self.queues.values())
+
+    async def close(self, timeout=10):
+        """Give queued posts up to timeout seconds to finish, then stop the workers."""
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self.queues.values())), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self.pending()} queued posts on shutdown")
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+        self.queues = {}
@@ -0,0 +1,29 @@
+# reaction_routes.py
+
+import logging
+
+logger = logging.getLogger('discord.reaction_routes')
+
+
+class ReactionRoutes:
+    """Message ID -> reaction handler table (bot.reaction_routes).
+
+    Cogs register the messages they care about; the ReactionDispatcher cog
+    probes this table once per raw reaction event and drops everything else.
+    """
+
+    def __init__(self):
+        self.handlers = {}  # Message ID -> async handler(payload)
+        self.stats = {"events": 0, "routed": 0}
+
+    def register(self, message_id, handler):
+        self.handlers[message_id] = handler
+
+    def unregister(self, message_id):
+        self.handlers.pop(message_id, None)
+
+    def get(self, message_id):
+        return self.handlers.get(message_id)
+
+    def __len__(self):
+        return len(self.handlers)
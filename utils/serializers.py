@@ -0,0 +1,67 @@
+# serializers.py
+#
+# Pluggable JSON encoding for every data file. orjson or msgspec are used when
+# installed, with the standard library as fallback. Files are written compact
+# unless pretty output is requested (config.PRETTY_JSON) for hand editing.
+
+import json
+
+import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Exceptions raised for malformed input, whichever backend is active
+DecodeError = (json.JSONDecodeError,) + ((msgspec.DecodeError,) if msgspec else ())
+
+BACKENDS = ["stdlib"] + (["msgspec"] if msgspec else []) + (["orjson"] if orjson else [])
+
+
+def _pick_backend(name):
+    if name == "auto":
+        return BACKENDS[-1]
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend {name!r} is not installed (available: {', '.join(BACKENDS)})")
+    return name
+
+
+backend = _pick_backend(config.JSON_BACKEND)
+
+
+def dumps(obj, pretty=None, backend_name=None):
+    """Encode obj to UTF-8 JSON bytes. pretty defaults to config.PRETTY_JSON."""
+    if pretty is None:
+        pretty = config.PRETTY_JSON
+    name = backend_name or backend
+    if name == "orjson":
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, option=option)
+    if name == "msgspec":
+        encoded = msgspec.json.encode(obj)
+        return msgspec.json.format(encoded, indent=2) if pretty else encoded
+    if pretty:
+        return json.dumps(obj, indent=4).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data, backend_name=None):
+    """Decode JSON from bytes or str."""
+    name = backend_name or backend
+    if name == "orjson":
+        return orjson.loads(data)
+    if name == "msgspec":
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+def read_file(path, backend_name=None):
+    """Read and decode a JSON file. Raises FileNotFoundError or one of DecodeError."""
+    with open(path, "rb") as file:
+        return loads(file.read(), backend_name)
@@ -0,0 +1,83 @@
+# startup.py
+
+import asyncio
+import logging
+import time
+
+from discord.ext import commands
+
+logger = logging.getLogger('discord.startup')
+
+
+class StartupOrchestrator:
+    """Loads the cogs and runs their one-time startup work (bot.startup).
+
+    Extensions are loaded concurrently. Once the bot is first ready, every cog
+    defining an async `warmup()` has it run, all in parallel. on_ready fires
+    again after each reconnect, but warmups only ever run once per process.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.load_times = {}  # Extension name -> seconds to load (None if it failed)
+        self.warmup_times = {}  # Cog name -> seconds to warm up (None if it failed)
+        self.warmed_up = False
+        self.ready_count = 0
+
+    async def _timed(self, coro):
+        """Await coro, returning (seconds taken, exception or None)."""
+        start = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            return time.perf_counter() - start, e
+        return time.perf_counter() - start, None
+
+    async def load_extensions(self, names):
+        """Load all extensions concurrently; failures are logged and don't stop the others."""
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._timed(self.bot.load_extension(name)) for name in names))
+        for name, (elapsed, error) in zip(names, results):
+            if error is None:
+                self.load_times[name] = elapsed
+                logger.info(f"Loaded extension: {name} successfully")
+            else:
+                self.load_times[name] = None
+                if isinstance(error, commands.ExtensionFailed):
+                    logger.error(f"Extension {name} failed to load. Error: {error}")
+                else:
+                    logger.error(f"Unexpected error loading extension {name}. Error: {error}")
+        logger.info(f"Loaded {len(names)} extensions in {time.perf_counter() - start:.2f}s")
+
+    async def on_ready(self):
+        """Listener (registered in main.py) running the cog warmups on the first ready only."""
+        self.ready_count += 1
+        if self.warmed_up:
+            logger.info(f"Reconnected (ready #{self.ready_count}); startup work already done")
+            return
+        self.warmed_up = True  # Set before awaiting so a quick reconnect can't start a second run
+
+        cogs = {name: cog.warmup for name, cog in self.bot.cogs.items()
+                if asyncio.iscoroutinefunction(getattr(cog, "warmup", None))}
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._timed(warmup()) for warmup in cogs.values()))
+        for name, (elapsed, error) in zip(cogs, results):
+            self.warmup_times[name] = None if error else elapsed
+            if error is not None:
+                logger.error(f"Warmup of {name} failed: {error!r}")
+        logger.info(f"Warmed up {len(cogs)} cogs in {time.perf_counter() - start:.2f}s")
+        logger.info(self.report())
+
+    def report(self):
+        """Return a per-cog timing summary, slowest first."""
+        def line(name, elapsed):
+            return f"  {name}: " + ("failed" if elapsed is None else f"{elapsed * 1000:.0f} ms")
+
+        def ordered(times):
+            return sorted(times.items(), key=lambda item: -1 if item[1] is None else item[1], reverse=True)
+
+        lines = ["Startup timings", "Extension loads:"]
+        lines += [line(name, elapsed) for name, elapsed in ordered(self.load_times)]
+        lines.append("Warmups:")
+        lines += [line(name, elapsed) for name, elapsed in ordered(self.warmup_times)]
+        return "\n".join(lines)
@@ -0,0 +1,56 @@
+# storage.py
+
+import asyncio
+import logging
+
+from utils import serializers
+from utils.write_coordinator import dump_json
+
+logger = logging.getLogger('discord.storage')
+
+
+def read_json(path, default=None):
+    """Read a JSON file, returning default if it is missing or unreadable."""
+    try:
+        return serializers.read_file(path)
+    except FileNotFoundError:
+        return default
+    except serializers.DecodeError as e:
+        logger.error(f"Error parsing {path}: {e}")
+        return default
+
+
+class AsyncStorage:
+    """Async JSON storage used by the cogs (bot.storage).
+
+    Reads run in a worker thread, and concurrent reads of the same path share
+    one in-flight read. Writes go through the WriteCoordinator, so they are
+    atomic, serialized per file and coalesced.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self._reads = {}  # Path -> future of the read currently in flight
+
+    async def load_json(self, path, default=None):
+        """Read and parse a JSON file off the event loop.
+
+        Callers that arrive while a read of the same path is in flight get the
+        same parsed object, so copy it before mutating if it may be shared.
+        """
+        path = str(path)
+        future = self._reads.get(path)
+        if future is None:
+            future = asyncio.ensure_future(asyncio.to_thread(read_json, path, default))
+            self._reads[path] = future
+            future.add_done_callback(lambda _: self._reads.pop(path, None))
+        # Shield so one cancelled caller doesn't cancel the read for the others
+        return await asyncio.shield(future)
+
+    def save_json(self, path, data, serializer=dump_json):
+        """Queue data to be written; returns a future resolved once it is on disk."""
+        return self.writer.submit(path, data, serializer)
+
+    async def write_json(self, path, data, serializer=dump_json):
+        """Write data and wait until it is on disk."""
+        await self.writer.submit(path, data, serializer)
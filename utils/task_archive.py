@@ -0,0 +1,150 @@
+# task_archive.py
+
+import asyncio
+import gzip
+import logging
+import os
+import time
+from pathlib import Path
+
+import config
+from utils import serializers
+from utils.task_manager import FINISHED_AT_KEY
+from utils.task_stores import _FILTER_KEYS, FINISHED_STATUSES
+
+logger = logging.getLogger('discord.task_archive')
+
+
+class TaskArchiver:
+    """Moves old finished tasks out of the task store into cold archives (bot.task_archiver).
+
+    Archives are gzip-compressed JSONL files, one per month the tasks finished
+    in (tasks-2024-11.jsonl.gz). Each pass appends a new gzip member, so files
+    are never rewritten. Tasks are only removed from the store once their
+    archive write has been fsynced.
+    """
+
+    def __init__(self, task_manager, archive_dir=config.TASK_ARCHIVE_DIR,
+                 max_age_days=config.TASK_ARCHIVE_AFTER_DAYS, interval=config.TASK_ARCHIVE_INTERVAL):
+        self.task_manager = task_manager
+        self.archive_dir = Path(archive_dir)
+        self.max_age = max_age_days * 86400
+        self.interval = interval
+        self.stats = {"passes": 0, "archived": 0, "last_pass_ms": 0.0}
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.archive()
+            except Exception as e:
+                logger.error(f"Task archive pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    @staticmethod
+    def partition_for(task):
+        """Return the archive partition name (YYYY-MM) for a finished task."""
+        return time.strftime("%Y-%m", time.gmtime(task[FINISHED_AT_KEY]))
+
+    def _path(self, partition):
+        return self.archive_dir / f"tasks-{partition}.jsonl.gz"
+
+    async def archive(self, now=None):
+        """Archive finished tasks older than max_age. Returns how many tasks were moved."""
+        async with self._lock:
+            start = time.perf_counter()
+            cutoff = (now or time.time()) - self.max_age
+            partitions = {}
+            unstamped = []
+            for status in FINISHED_STATUSES:
+                # Waits for pending task writes; disk reads run in a worker thread
+                for task in await self.task_manager.query_tasks_async(status=status):
+                    finished_at = task.get(FINISHED_AT_KEY)
+                    if finished_at is None:
+                        unstamped.append(task)
+                    elif finished_at <= cutoff:
+                        partitions.setdefault(self.partition_for(task), []).append(task)
+            if unstamped:
+                # Finish time unknown (tasks from before it was tracked): their retention starts now
+                await self.task_manager.stamp_finished(unstamped)
+            if not partitions:
+                return 0
+
+            await asyncio.to_thread(self._append, partitions)
+            task_ids = [task["Task ID"] for tasks in partitions.values() for task in tasks]
+            removed = self.task_manager.remove_tasks(task_ids)
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stats["passes"] += 1
+            self.stats["archived"] += removed
+            self.stats["last_pass_ms"] = elapsed_ms
+            logger.info(f"Archived {removed} finished tasks into {len(partitions)} partitions in {elapsed_ms:.1f} ms")
+            return removed
+
+    def _append(self, partitions):
+        """Append each partition's tasks as a new gzip member and fsync it."""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        for partition, tasks in partitions.items():
+            payload = b"".join(serializers.dumps(task, pretty=False) + b"\n" for task in tasks)
+            with open(self._path(partition), "ab") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+                    archive.write(payload)
+                raw.flush()
+                os.fsync(raw.fileno())
+
+    def partitions(self):
+        """Return archived partition names, oldest first."""
+        if not self.archive_dir.exists():
+            return []
+        return sorted(path.name[len("tasks-"):-len(".jsonl.gz")] for path in self.archive_dir.glob("tasks-*.jsonl.gz"))
+
+    def iter_archived(self, since=None, until=None, **filters):
+        """Stream archived tasks matching all filters, oldest partition first.
+
+        since/until are inclusive "YYYY-MM" bounds that skip whole partitions;
+        filters use the same names as TaskManager.query_tasks (status=..., assigned_to=...).
+        """
+        for key in filters:
+            if key not in _FILTER_KEYS:
+                raise ValueError(f"Unknown task filter: {key}")
+        for partition in self.partitions():
+            if (since and partition < since) or (until and partition > until):
+                continue
+            with gzip.open(self._path(partition), "rb") as archive:
+                for line in archive:
+                    try:
+                        task = serializers.loads(line)
+                    except serializers.DecodeError:
+                        logger.warning(f"Skipping unreadable archived task in {partition}")
+                        continue
+                    if all(task.get(_FILTER_KEYS[key]) == value for key, value in filters.items()):
+                        yield task
+
+    async def query(self, limit=None, since=None, until=None, **filters):
+        """Collect up to limit archived tasks in a worker thread, see iter_archived."""
+        def collect():
+            matches = []
+            for task in self.iter_archived(since=since, until=until, **filters):
+                matches.append(task)
+                if limit is not None and len(matches) >= limit:
+                    break
+            return matches
+        return await asyncio.to_thread(collect)
+
+    def get_stats(self):
+        return {
+            "passes": self.stats["passes"],
+            "archived": self.stats["archived"],
+            "last_pass_ms": round(self.stats["last_pass_ms"], 1),
+            "partitions": len(self.partitions()),
+        }
@@ -0,0 +1,374 @@
+# task_manager.py
+
+import asyncio
+import logging
+import sqlite3
+import time
+
+import config
+from utils.task_stores import FINISHED_STATUSES, create_task_store
+
+logger = logging.getLogger('discord.task_manager')
+
+# Bookkeeping keys stored on tasks but never shown in task embeds
+FINISHED_AT_KEY = "Finished at"  # Unix time the task reached a finished status, used for archiving
+VERSION_KEY = "Version"  # Bumped by every update_task, so renders can be cached per version
+HIDDEN_TASK_KEYS = ("Message ID", "Task ID", FINISHED_AT_KEY, VERSION_KEY)
+
+
+class TaskManager:
+    """Manages tasks and their interactions.
+
+    One instance is shared by the whole bot (bot.task_manager, created in main.py)
+    so every cog sees the same tasks and there is a single writer per file.
+    """
+
+    def __init__(self, store=None, writer=None, write_behind=config.TASK_WRITE_BEHIND,
+                 flush_delay=config.TASK_FLUSH_DELAY, flush_threshold=config.TASK_FLUSH_THRESHOLD):
+        self.tasks = {}
+        # Backend that persists tasks (SQLite by default, see config.TASK_STORE_BACKEND)
+        self.store = store or create_task_store(
+            config.TASK_STORE_BACKEND,
+            json_path=config.TASK_JSON_PATH,
+            db_path=config.TASK_DB_PATH,
+            journal_path=config.TASK_JOURNAL_PATH,
+            snapshot_path=config.TASK_SNAPSHOT_PATH,
+            writer=writer,
+        )
+        # Write-behind: updates only mark tasks dirty, and a single flush persists them later
+        self.write_behind = write_behind
+        self.flush_delay = flush_delay  # Seconds to coalesce updates before flushing
+        self.flush_threshold = flush_threshold  # Flush immediately once this many tasks are dirty
+        self.dirty = set()
+        self.pending_events = []  # State transitions since the last flush, for journaling stores
+        self.writing = set()  # Task IDs whose store write is still in flight; they count as dirty
+        self._writes = set()  # Store write futures still in flight
+        self._flush_handle = None
+        self.stats = {
+            "flushes": 0,
+            "tasks_flushed": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+        # Secondary indexes so hot lookups don't scan every task ever created
+        self.message_index = {}  # Message ID -> set of Task IDs (aggregated posts carry several)
+        self.status_index = {}  # Status -> set of Task IDs
+        self.assignee_index = {}  # Assigned to -> set of Task IDs
+        self._indexed_keys = {}  # Task ID -> (Message ID, Status, Assigned to) as last indexed
+        self.listeners = []  # Callables notified as listener(task, event) after every update
+        self.load_tasks()
+
+    def load_tasks(self):
+        self.tasks = self.store.load()
+        self.rebuild_indexes()
+
+    def save_tasks(self):
+        """Hand dirty tasks to the store. Returns a future if the store commits them later."""
+        dirty_tasks = {task_id: self.tasks[task_id] for task_id in self.dirty if task_id in self.tasks}
+        return self.store.write(dirty_tasks, self.tasks, self.pending_events)
+
+    def rebuild_indexes(self):
+        """Rebuild all secondary indexes from the loaded tasks."""
+        self.message_index = {}
+        self.status_index = {}
+        self.assignee_index = {}
+        self._indexed_keys = {}
+        for task_id, task in self.tasks.items():
+            self._index_task(task_id, task)
+
+    def _index_task(self, task_id, task):
+        """Add a task to the secondary indexes."""
+        keys = (task.get("Message ID"), task.get("Status"), task.get("Assigned to"))
+        message_id, status, assignee = keys
+        if message_id is not None:
+            self.message_index.setdefault(message_id, set()).add(task_id)
+        if status is not None:
+            self.status_index.setdefault(status, set()).add(task_id)
+        if assignee is not None:
+            self.assignee_index.setdefault(assignee, set()).add(task_id)
+        self._indexed_keys[task_id] = keys
+
+    def _unindex_task(self, task_id):
+        """Remove a task from the secondary indexes using the values it was indexed under.
+
+        Callers usually mutate the task dict in place before calling update_task,
+        so the old values have to come from _indexed_keys rather than the task itself.
+        """
+        keys = self._indexed_keys.pop(task_id, None)
+        if keys is None:
+            return
+        message_id, status, assignee = keys
+        for index, key in ((self.message_index, message_id), (self.status_index, status), (self.assignee_index, assignee)):
+            if key is None:
+                continue
+            ids = index.get(key)
+            if ids:
+                ids.discard(task_id)
+                if not ids:
+                    del index[key]
+
+    def _describe_change(self, task_id, task):
+        """Build a small event record describing how a task changed since it was last indexed."""
+        previous = self._indexed_keys.get(task_id)
+        if previous is None:
+            return {"event": "create", "Task ID": task_id, "ts": time.time(), "fields": dict(task)}
+
+        old_message_id, old_status, old_assignee = previous
+        status = task.get("Status")
+        if status != old_status and status == "In Progress":
+            event = "accept"
+        elif status != old_status and status == "Completed":
+            event = "complete"
+        elif status != old_status and (status == "Abandoned" or old_status == "In Progress"):
+            event = "abandon"
+        elif task.get("Message ID") != old_message_id:
+            event = "message_id"
+        elif task.get("Assigned to") != old_assignee:
+            event = "assign"
+        else:
+            # Something outside the indexed fields changed, record the whole task
+            return {"event": "update", "Task ID": task_id, "ts": time.time(), "fields": dict(task)}
+
+        # Bookkeeping keys ride along so a journal replay restores them too
+        fields = {
+            "Message ID": task.get("Message ID"),
+            "Status": status,
+            "Assigned to": task.get("Assigned to"),
+            FINISHED_AT_KEY: task.get(FINISHED_AT_KEY),
+            VERSION_KEY: task.get(VERSION_KEY),
+        }
+        return {"event": event, "Task ID": task_id, "ts": time.time(), "fields": fields}
+
+    def update_task(self, task_id, task_data):
+        if task_data.get("Status") in FINISHED_STATUSES:
+            if task_data.get(FINISHED_AT_KEY) is None:
+                task_data[FINISHED_AT_KEY] = time.time()
+        else:
+            task_data.pop(FINISHED_AT_KEY, None)
+        task_data[VERSION_KEY] = task_data.get(VERSION_KEY, 0) + 1
+        change = self._describe_change(task_id, task_data)
+        self.pending_events.append(change)
+        self.tasks[task_id] = task_data
+        self._unindex_task(task_id)
+        self._index_task(task_id, task_data)
+        self.mark_dirty(task_id)
+        self._notify(task_data, change["event"])
+
+    async def stamp_finished(self, tasks, finished_at=None):
+        """Give finished tasks without a finish time one (now, by default).
+
+        Tasks that only live in the store are written straight back to it, so
+        they are not pulled into memory and no listener is notified.
+        """
+        finished_at = finished_at or time.time()
+        stored = {}
+        for task in tasks:
+            task_id = task["Task ID"]
+            if task_id in self.tasks:
+                task = self.tasks[task_id]
+                task[FINISHED_AT_KEY] = finished_at
+                self.pending_events.append({"event": "update", "Task ID": task_id, "ts": time.time(), "fields": dict(task)})
+                self.mark_dirty(task_id)
+            else:
+                task[FINISHED_AT_KEY] = finished_at
+                stored[task_id] = task
+        if not stored:
+            return
+        try:
+            written = self.store.write(stored, self.tasks)
+            if asyncio.isfuture(written):
+                await written
+        except (OSError, sqlite3.Error) as e:
+            # Still unstamped, so the next archive pass tries again
+            logger.error(f"Failed to stamp {len(stored)} finished tasks: {e}")
+
+    def remove_tasks(self, task_ids):
+        """Drop tasks from memory, the indexes and the store (used by the archiver)."""
+        self.flush()  # The store must not receive stale upserts for removed tasks afterwards
+        task_ids = list(task_ids)
+        for task_id in task_ids:
+            self.tasks.pop(task_id, None)
+            self._unindex_task(task_id)
+        if task_ids:
+            self.store.delete(task_ids, self.tasks)
+        return len(task_ids)
+
+    def add_listener(self, listener):
+        """Register a callable to be notified as listener(task, event) when a task changes."""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def _notify(self, task, event):
+        for listener in self.listeners:
+            try:
+                listener(task, event)
+            except Exception as e:
+                logger.error(f"Task listener {listener} failed on {event} for task {task.get('Task ID')}: {e}")
+
+    def mark_dirty(self, task_id):
+        """Record that a task changed and persist it now or on the next flush."""
+        self.dirty.add(task_id)
+        if not self.write_behind or len(self.dirty) >= self.flush_threshold:
+            self.flush()
+        else:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Schedule a flush after flush_delay unless one is already pending."""
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. scripts), nothing would ever run the timer
+            self.flush()
+            return
+        self._flush_handle = loop.call_later(self.flush_delay, self.flush)
+
+    def flush(self):
+        """Write all dirty tasks to disk in one pass.
+
+        Stores that commit off the event loop return a future. Until it
+        resolves the tasks count as dirty, and they are marked dirty again if
+        the commit fails; wait_written() waits for it.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self.dirty:
+            return
+
+        task_ids = set(self.dirty)
+        events = self.pending_events
+        start = time.perf_counter()
+        try:
+            written = self.save_tasks()
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Failed to flush {len(task_ids)} dirty tasks: {e}")
+            return
+        self.dirty.clear()
+        self.pending_events = []
+
+        if not asyncio.isfuture(written):
+            self._record_flush(len(task_ids), (time.perf_counter() - start) * 1000)
+            return
+        self.writing |= task_ids
+        self._writes.add(written)
+        written.add_done_callback(lambda future: self._on_written(future, task_ids, events, start))
+
+    def _on_written(self, future, task_ids, events, start):
+        """Account for a store commit that ran off the event loop; failed changes are retried."""
+        self._writes.discard(future)
+        self.writing -= task_ids
+        error = asyncio.CancelledError() if future.cancelled() else future.exception()
+        if error is not None:
+            logger.error(f"Failed to flush {len(task_ids)} dirty tasks, will retry: {error!r}")
+            # Tasks removed meanwhile (archived) must not be written back
+            self.dirty |= {task_id for task_id in task_ids if task_id in self.tasks}
+            self.pending_events = events + self.pending_events
+            self._schedule_flush()
+            return
+        # Measured until the commit landed, not just until it was queued
+        self._record_flush(len(task_ids), (time.perf_counter() - start) * 1000)
+
+    async def wait_written(self):
+        """Flush, then wait until every store write so far has landed (or failed)."""
+        self.flush()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    def _record_flush(self, dirty_count, elapsed_ms):
+        self.stats["flushes"] += 1
+        self.stats["tasks_flushed"] += dirty_count
+        self.stats["last_flush_ms"] = elapsed_ms
+        self.stats["max_flush_ms"] = max(self.stats["max_flush_ms"], elapsed_ms)
+        self.stats["total_flush_ms"] += elapsed_ms
+        logger.debug(f"Flushed {dirty_count} dirty tasks in {elapsed_ms:.1f} ms")
+
+    def close(self):
+        """Flush pending changes and release the store."""
+        self.flush()
+        self.store.close()
+
+    def get_stats(self):
+        """Return persistence statistics for monitoring."""
+        flushes = self.stats["flushes"]
+        return {
+            "dirty_count": len(self.dirty | self.writing),
+            "flushes": flushes,
+            "tasks_flushed": self.stats["tasks_flushed"],
+            "last_flush_ms": round(self.stats["last_flush_ms"], 2),
+            "max_flush_ms": round(self.stats["max_flush_ms"], 2),
+            "avg_flush_ms": round(self.stats["total_flush_ms"] / flushes, 2) if flushes else 0.0,
+        }
+
+    def get_task(self, task_id):
+        task = self.tasks.get(task_id)
+        if task is None:
+            # Finished tasks may only live in the store
+            task = self.store.get(task_id)
+        return task
+
+    async def get_task_async(self, task_id):
+        """get_task for coroutines: a store lookup runs off the event loop."""
+        task = self.tasks.get(task_id)
+        if task is None and self.store.blocking_reads:
+            return await asyncio.to_thread(self.store.get, task_id)
+        return task if task is not None else self.store.get(task_id)
+
+    def get_task_by_message_id(self, message_id):
+        # Only open tasks are considered so unrelated reactions cost a single dict probe.
+        # Messages carrying several tasks (aggregated posts) have no single task.
+        task_ids = self.message_index.get(message_id)
+        if not task_ids or len(task_ids) > 1:
+            return None
+        return self.tasks.get(next(iter(task_ids)))
+
+    def get_tasks_by_message_id(self, message_id):
+        """Return every task posted on a message, including finished tasks only kept in the store."""
+        tasks = {task_id: self.tasks[task_id] for task_id in self.message_index.get(message_id, ())}
+        for task in self.store.get_by_message_id(message_id):
+            tasks.setdefault(task["Task ID"], task)
+        return list(tasks.values())
+
+    async def get_tasks_by_message_id_async(self, message_id):
+        """get_tasks_by_message_id for coroutines: the store lookup runs off the event loop."""
+        tasks = {task_id: self.tasks[task_id] for task_id in self.message_index.get(message_id, ())}
+        if self.store.blocking_reads:
+            stored = await asyncio.to_thread(self.store.get_by_message_id, message_id)
+        else:
+            stored = self.store.get_by_message_id(message_id)
+        for task in stored:
+            tasks.setdefault(task["Task ID"], task)
+        return list(tasks.values())
+
+    def query_tasks(self, limit=None, **filters):
+        """Query the store by indexed column, including tasks not held in memory.
+
+        Store reads are ordered after the writes queued by this flush, except
+        on the JSON backend, where coroutines should use query_tasks_async.
+        """
+        self.flush()  # Make sure the store sees pending changes
+        return self.store.query(limit=limit, **filters)
+
+    async def query_tasks_async(self, limit=None, **filters):
+        """query_tasks for coroutines: waits for pending writes and reads disk off the event loop."""
+        await self.wait_written()
+        if self.store.blocking_reads:
+            return await asyncio.to_thread(self.store.query, limit=limit, **filters)
+        return self.store.query(limit=limit, **filters)
+
+    def get_tasks_by_status(self, status):
+        """Return all tasks currently in the given status."""
+        return [self.tasks[task_id] for task_id in self.status_index.get(status, ())]
+
+    def get_tasks_by_assignee(self, assignee):
+        """Return all tasks currently assigned to the given user name."""
+        return [self.tasks[task_id] for task_id in self.assignee_index.get(assignee, ())]
+
+    def get_all_tasks(self):
+        return self.tasks.values()
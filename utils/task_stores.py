@@ -0,0 +1,448 @@
+# task_stores.py
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import config
+from utils import serializers
+from utils.write_coordinator import dump_json, write_atomic
+
+logger = logging.getLogger('discord.task_stores')
+
+# Tasks in these states never change again, so they don't need to stay in memory
+FINISHED_STATUSES = ("Completed", "Abandoned")
+
+
+class JsonTaskStore:
+    """Stores every task as one JSON list. Each write rewrites the whole file."""
+
+    blocking_reads = True  # query() parses the file
+
+    def __init__(self, path="data/tasks.json", writer=None):
+        self.path = Path(path)
+        self.writer = writer  # WriteCoordinator; writes are synchronous without one
+
+    def load(self):
+        """Return all tasks keyed by Task ID."""
+        try:
+            task_list = serializers.read_file(self.path)
+            return {task["Task ID"]: task for task in task_list}
+        except (FileNotFoundError, *serializers.DecodeError):
+            return {}
+
+    def write(self, dirty_tasks, all_tasks, events=()):
+        """Persist changes. The JSON format can only be rewritten in full.
+
+        Returns the writer's future when the write is committed later.
+        """
+        if self.writer is not None:
+            return self.writer.submit(self.path, list(all_tasks.values()))
+        else:
+            write_atomic(self.path, dump_json(list(all_tasks.values())))
+
+    def delete(self, task_ids, all_tasks):
+        """Remove tasks; all_tasks no longer contains them, so this is a rewrite."""
+        self.write({}, all_tasks)
+
+    def get(self, task_id):
+        # Everything is loaded into memory, so a miss there is a miss here
+        return None
+
+    def get_by_message_id(self, message_id):
+        return []
+
+    def query(self, limit=None, **filters):
+        """Scan the file for tasks matching all given column filters."""
+        matches = [
+            task for task in self.load().values()
+            if all(task.get(_FILTER_KEYS[key]) == value for key, value in filters.items())
+        ]
+        return matches[:limit] if limit is not None else matches
+
+    def close(self):
+        pass
+
+
+# Query filter name -> task dict key; each is an indexed column in SQLite
+_FILTER_KEYS = {
+    "task_id": "Task ID",
+    "message_id": "Message ID",
+    "status": "Status",
+    "assigned_to": "Assigned to",
+    "item_needed": "Item Needed",
+    "delivery_location": "Delivery Location",
+}
+
+
+class SqliteTaskStore:
+    """Stores tasks in SQLite (WAL mode) with indexed lookup columns.
+
+    Only open tasks are loaded at startup; finished tasks stay on disk and are
+    fetched on demand through get/get_by_message_id/query. Writes run on a
+    dedicated thread so commits never block the event loop. Reads go through
+    the same thread, so they always see every write queued before them.
+    """
+
+    blocking_reads = True  # Reads wait for queued commits
+
+    def __init__(self, path="data/tasks.db", import_from="data/tasks.json"):
+        self.path = Path(path)
+        # Shared with the write thread; sqlite3 serializes access to the connection
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-store")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        if import_from and not self._get_meta("json_imported"):
+            self.import_json(import_from)
+
+    def _create_schema(self):
+        with self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    message_id INTEGER,
+                    status TEXT,
+                    assigned_to TEXT,
+                    item_needed TEXT,
+                    delivery_location TEXT,
+                    data TEXT NOT NULL
+                )
+                """
+            )
+            for column in ("message_id", "status", "assigned_to", "item_needed", "delivery_location"):
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tasks_{column} ON tasks ({column})")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _row(task):
+        """Convert a task dict to a row for the tasks table."""
+        return (
+            task["Task ID"],
+            task.get("Message ID"),
+            task.get("Status"),
+            task.get("Assigned to"),
+            task.get("Item Needed"),
+            task.get("Delivery Location"),
+            serializers.dumps(task, pretty=False).decode("utf-8"),
+        )
+
+    def import_json(self, json_path):
+        """One-shot import of an existing tasks.json list into the database."""
+        json_path = Path(json_path)
+        imported = 0
+        if json_path.exists():
+            try:
+                task_list = serializers.read_file(json_path)
+            except serializers.DecodeError as e:
+                logger.error(f"Could not import {json_path}: {e}")
+                return 0
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [self._row(task) for task in task_list],
+                )
+            imported = len(task_list)
+            logger.info(f"Imported {imported} tasks from {json_path} into {self.path}")
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('json_imported', '1')")
+        return imported
+
+    def load(self):
+        """Return open tasks keyed by Task ID."""
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        rows = self.conn.execute(
+            f"SELECT data FROM tasks WHERE status IS NULL OR status NOT IN ({placeholders})",
+            FINISHED_STATUSES,
+        )
+        tasks = (serializers.loads(data) for (data,) in rows)
+        return {task["Task ID"]: task for task in tasks}
+
+    def write(self, dirty_tasks, all_tasks, events=()):
+        """Upsert only the changed rows in a single transaction.
+
+        With an event loop running, returns a future resolved once committed.
+        """
+        rows = [self._row(task) for task in dirty_tasks.values()]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_rows(rows)
+            return None
+        # One worker thread keeps commits in order
+        return loop.run_in_executor(self._executor, self._write_rows, rows)
+
+    def _write_rows(self, rows):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete(self, task_ids, all_tasks):
+        """Delete rows on the write thread, after any upserts already queued."""
+        rows = [(task_id,) for task_id in task_ids]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._delete_rows(rows)
+            return
+        future = loop.run_in_executor(self._executor, self._delete_rows, rows)
+        future.add_done_callback(self._on_written)
+
+    def _delete_rows(self, rows):
+        with self.conn:
+            self.conn.executemany("DELETE FROM tasks WHERE task_id = ?", rows)
+
+    @staticmethod
+    def _on_written(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Failed to write tasks to SQLite: {future.exception()}")
+
+    def _read(self, sql, params):
+        """Run a SELECT on the write thread, after every commit queued before it."""
+        def fetch():
+            return [serializers.loads(data) for (data,) in self.conn.execute(sql, params)]
+        return self._executor.submit(fetch).result()
+
+    def get(self, task_id):
+        rows = self._read("SELECT data FROM tasks WHERE task_id = ?", (task_id,))
+        return rows[0] if rows else None
+
+    def get_by_message_id(self, message_id):
+        """Return every task posted on a message (aggregated mass-order posts hold several)."""
+        return self._read("SELECT data FROM tasks WHERE message_id = ?", (message_id,))
+
+    def query(self, limit=None, **filters):
+        """Return tasks matching all given column filters, e.g. query(status="Pending")."""
+        clauses = []
+        params = []
+        for key, value in filters.items():
+            if key not in _FILTER_KEYS:
+                raise ValueError(f"Unknown task filter: {key}")
+            if value is None:
+                clauses.append(f"{key} IS NULL")
+            else:
+                clauses.append(f"{key} = ?")
+                params.append(value)
+        sql = "SELECT data FROM tasks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._read(sql, params)
+
+    def close(self):
+        self._executor.shutdown(wait=True)  # Let queued commits finish
+        self.conn.close()
+
+
+class JournalTaskStore:
+    """Stores tasks as a snapshot plus an append-only JSONL journal of state transitions.
+
+    Each write appends one record per event (create, accept, complete, abandon,
+    message_id, ...). A background compactor periodically rotates the journal
+    into a history segment and writes a snapshot that records the last segment
+    it covers, so the full transition history is kept without being replayed at
+    startup. The snapshot write runs off the event loop; until it lands, startup
+    simply replays the newer segments too.
+    """
+
+    blocking_reads = False  # Queries scan the in-memory tasks
+
+    def __init__(self, journal_path="data/tasks_journal.jsonl", snapshot_path="data/tasks_snapshot.json",
+                 history_dir="data/task_history", import_from="data/tasks.json",
+                 compact_interval=600, compact_threshold=5000, writer=None):
+        self.journal_path = Path(journal_path)
+        self.snapshot_path = Path(snapshot_path)
+        self.history_dir = Path(history_dir)
+        self.import_from = Path(import_from) if import_from else None
+        self.compact_interval = compact_interval
+        self.compact_threshold = compact_threshold
+        self.journal_records = 0  # Records appended since the last compaction
+        self.writer = writer  # WriteCoordinator for snapshots; synchronous without one
+        self._tasks = {}  # Live task dict owned by TaskManager, used when compacting
+        self._journal = None
+        self._compact_handle = None
+
+    def _segments(self):
+        """Return history segments, oldest first."""
+        if not self.history_dir.exists():
+            return []
+        return sorted(self.history_dir.glob("journal-*.jsonl"), key=lambda p: int(p.stem.split("-")[1]))
+
+    def load(self):
+        """Replay the snapshot plus any newer journal records and return all tasks keyed by Task ID."""
+        segments = self._segments()
+        if self.snapshot_path.exists():
+            snapshot = serializers.read_file(self.snapshot_path)
+            if isinstance(snapshot, list):
+                # Older snapshots were written only after every segment was folded in
+                snapshot = {"tasks": snapshot, "folded_through": segments[-1].name if segments else None}
+            tasks = {task["Task ID"]: task for task in snapshot["tasks"]}
+            folded_through = snapshot.get("folded_through")
+            if folded_through:
+                names = [segment.name for segment in segments]
+                if folded_through in names:
+                    segments = segments[names.index(folded_through) + 1:]
+        else:
+            if self.import_from and self.import_from.exists():
+                # First start on this backend: seed from the legacy tasks.json
+                tasks = {task["Task ID"]: task for task in serializers.read_file(self.import_from)}
+                logger.info(f"Seeded task snapshot with {len(tasks)} tasks from {self.import_from}")
+            else:
+                tasks = {}
+
+        self.journal_records = 0
+        for path in segments + [self.journal_path]:
+            if not path.exists():
+                continue
+            with open(path, "rb") as file:
+                for line in file:
+                    try:
+                        record = serializers.loads(line)
+                    except serializers.DecodeError:
+                        # A torn final line from a crash mid-append; everything before it is valid
+                        logger.warning(f"Skipping unreadable journal record in {path}")
+                        continue
+                    self._apply(tasks, record)
+                    self.journal_records += 1
+
+        self._tasks = tasks
+        return tasks
+
+    @staticmethod
+    def _apply(tasks, record):
+        """Apply one journal record. Replaying a record twice gives the same result."""
+        task_id = record["Task ID"]
+        if record["event"] == "delete":
+            tasks.pop(task_id, None)
+        elif record["event"] in ("create", "update") or task_id not in tasks:
+            tasks[task_id] = dict(record["fields"])
+        else:
+            tasks[task_id].update(record["fields"])
+
+    def write(self, dirty_tasks, all_tasks, events=()):
+        """Append one journal line per event."""
+        self._tasks = all_tasks
+        if not events:
+            return
+        if self._journal is None:
+            self._journal = open(self.journal_path, "ab")
+        # Journal records are always compact: one record per line
+        self._journal.write(b"".join(serializers.dumps(event, pretty=False) + b"\n" for event in events))
+        self._journal.flush()
+        self.journal_records += len(events)
+
+        if self.journal_records >= self.compact_threshold:
+            self.compact()
+        else:
+            self._schedule_compaction()
+
+    def delete(self, task_ids, all_tasks):
+        """Journal a delete record per task so replay drops it."""
+        now = time.time()
+        self.write({}, all_tasks, [{"event": "delete", "Task ID": task_id, "ts": now, "fields": {}} for task_id in task_ids])
+
+    def _schedule_compaction(self):
+        """Arm the periodic compactor if an event loop is running."""
+        if self._compact_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._compact_handle = loop.call_later(self.compact_interval, self.compact)
+
+    def compact(self):
+        """Rotate the journal into history and write a snapshot covering it."""
+        if self._compact_handle is not None:
+            self._compact_handle.cancel()
+            self._compact_handle = None
+        if self.journal_records == 0:
+            return
+
+        # Rotating is a rename, so new records go to a fresh journal straight away
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        segment = None
+        if self.journal_path.exists():
+            self.history_dir.mkdir(parents=True, exist_ok=True)
+            segment = self.history_dir / f"journal-{time.time_ns()}.jsonl"
+            os.replace(self.journal_path, segment)
+
+        snapshot = {
+            "folded_through": segment.name if segment else None,
+            "tasks": list(self._tasks.values()),
+        }
+        if self.writer is not None:
+            self.writer.submit(self.snapshot_path, snapshot, serializer=lambda data: serializers.dumps(data, pretty=False))
+        else:
+            write_atomic(self.snapshot_path, serializers.dumps(snapshot, pretty=False))
+
+        logger.info(f"Compacted {self.journal_records} journal records into {self.snapshot_path}")
+        self.journal_records = 0
+
+    def iter_history(self, task_id=None):
+        """Yield journal records in order, oldest first, optionally for one task."""
+        segments = self._segments()
+        if self.journal_path.exists():
+            segments.append(self.journal_path)
+        for segment in segments:
+            with open(segment, "rb") as file:
+                for line in file:
+                    try:
+                        record = serializers.loads(line)
+                    except serializers.DecodeError:
+                        continue
+                    if task_id is None or record["Task ID"] == task_id:
+                        yield record
+
+    def get(self, task_id):
+        return None
+
+    def get_by_message_id(self, message_id):
+        return []
+
+    def query(self, limit=None, **filters):
+        """Filter the in-memory tasks by column."""
+        matches = [
+            task for task in self._tasks.values()
+            if all(task.get(_FILTER_KEYS[key]) == value for key, value in filters.items())
+        ]
+        return matches[:limit] if limit is not None else matches
+
+    def close(self):
+        self.compact()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+def create_task_store(backend, json_path="data/tasks.json", db_path="data/tasks.db",
+                      journal_path="data/tasks_journal.jsonl", snapshot_path="data/tasks_snapshot.json",
+                      writer=None):
+    """Build the task store for the configured backend name."""
+    if backend == "sqlite":
+        return SqliteTaskStore(db_path, import_from=json_path)
+    if backend == "journal":
+        return JournalTaskStore(
+            journal_path,
+            snapshot_path,
+            import_from=json_path,
+            compact_interval=config.TASK_COMPACT_INTERVAL,
+            compact_threshold=config.TASK_COMPACT_THRESHOLD,
+            writer=writer,
+        )
+    if backend == "json":
+        return JsonTaskStore(json_path, writer=writer)
+    raise ValueError(f"Unknown task store backend: {backend}")
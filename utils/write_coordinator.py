@@ -0,0 +1,129 @@
+# write_coordinator.py
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from utils import serializers
+
+logger = logging.getLogger('discord.write_coordinator')
+
+
+def dump_json(data):
+    """Default serializer: compact JSON from the configured backend (indented if config.PRETTY_JSON)."""
+    return serializers.dumps(data)
+
+
+def write_atomic(path, payload):
+    """Write bytes to path via a temp file + rename, so readers never see a half-written file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class _PendingWrite:
+    def __init__(self, data, serializer, future):
+        self.data = data
+        self.serializer = serializer
+        self.future = future
+
+
+class WriteCoordinator:
+    """Serializes, coalesces and offloads file commits, one queue per path (bot.writer).
+
+    submit() never blocks the event loop: serialization, fsync and rename run
+    in a worker thread. Commits to the same path never overlap, and writes
+    submitted while one is in flight collapse into a single follow-up commit
+    of the newest data.
+    """
+
+    def __init__(self):
+        self._pending = {}  # Path -> _PendingWrite waiting for the next commit
+        self._workers = {}  # Path -> task committing that path
+        self.stats = {"submitted": 0, "commits": 0, "coalesced": 0, "last_commit_ms": 0.0}
+
+    def submit(self, path, data, serializer=dump_json):
+        """Queue data to be written to path. Returns a future resolved once it is on disk.
+
+        data is serialized in a worker thread, so callers must not rely on it
+        staying unchanged; changing it afterwards should be followed by another
+        submit(), which coalesces with this one if it hasn't started yet.
+        """
+        path = str(path)
+        self.stats["submitted"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, final shutdown): commit synchronously
+            future = concurrent.futures.Future()
+            self._commit(path, data, serializer)
+            future.set_result(None)
+            return future
+
+        pending = self._pending.get(path)
+        if pending is not None:
+            # Not started yet: replace the payload, everybody waits for the same commit
+            pending.data = data
+            pending.serializer = serializer
+            self.stats["coalesced"] += 1
+            return pending.future
+
+        pending = _PendingWrite(data, serializer, loop.create_future())
+        self._pending[path] = pending
+        if path not in self._workers:
+            self._workers[path] = loop.create_task(self._drain(path))
+        return pending.future
+
+    async def write(self, path, data, serializer=dump_json):
+        """Submit a write and wait until it has been committed."""
+        await self.submit(path, data, serializer)
+
+    def _commit(self, path, data, serializer):
+        start = time.perf_counter()
+        for attempt in range(3):
+            try:
+                payload = serializer(data)
+                break
+            except RuntimeError:
+                # The loop mutated the data mid-serialization; take a fresh pass
+                if attempt == 2:
+                    raise
+        write_atomic(path, payload)
+        self.stats["commits"] += 1
+        self.stats["last_commit_ms"] = (time.perf_counter() - start) * 1000
+
+    async def _drain(self, path):
+        """Commit pending writes for one path until none are left."""
+        try:
+            while path in self._pending:
+                pending = self._pending.pop(path)
+                try:
+                    await asyncio.to_thread(self._commit, path, pending.data, pending.serializer)
+                except Exception as e:
+                    logger.error(f"Failed to write {path}: {e}")
+                    pending.future.set_exception(e)
+                else:
+                    pending.future.set_result(None)
+        finally:
+            del self._workers[path]
+
+    async def drain(self):
+        """Wait until every queued write has been committed."""
+        while self._workers:
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)